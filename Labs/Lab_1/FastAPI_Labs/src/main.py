@@ -1,6 +1,6 @@
 from fastapi import FastAPI, status, HTTPException
 from pydantic import BaseModel
-from predict import predict_data
+from predict import predict_data, get_monitor
 
 
 app = FastAPI()
@@ -34,6 +34,15 @@ async def predict_iris(iris_features: IrisData):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/drift")
+async def drift_report():
+    """Running feature statistics, class frequencies and PSI drift scores against the training split."""
+    return get_monitor().report()
+
+@app.on_event("shutdown")
+def save_monitor_state():
+    get_monitor().checkpoint()
+
 @app.post("/retrain")
 def retrain_model():
     import subprocess
@@ -0,0 +1,247 @@
+import os
+import csv
+import json
+import math
+import argparse
+import threading
+from bisect import bisect_right
+from pathlib import Path
+import numpy as np
+
+from data import load_data, split_data
+
+STATE_PATH = Path(__file__).resolve().parent.parent / "model" / "monitor_state.json"
+FEATURE_NAMES = ["sepal_length", "sepal_width", "petal_length", "petal_width"]
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+# Population Stability Index bands commonly used for drift alerts
+PSI_MODERATE = 0.1
+PSI_SIGNIFICANT = 0.25
+# Floor for empty bins so the PSI log term stays finite
+EPSILON = 1e-4
+
+
+def _psi(actual_counts, expected_fractions):
+    total = sum(actual_counts)
+    if total == 0:
+        return 0.0
+    psi = 0.0
+    for count, expected in zip(actual_counts, expected_fractions):
+        actual = max(count / total, EPSILON)
+        expected = max(expected, EPSILON)
+        psi += (actual - expected) * math.log(actual / expected)
+    return psi
+
+
+def _level(psi):
+    if psi >= PSI_SIGNIFICANT:
+        return "significant"
+    if psi >= PSI_MODERATE:
+        return "moderate"
+    return "none"
+
+
+class FeatureStats:
+    """
+    Running statistics of one feature: Welford count/mean/variance, min/max
+    and a fixed-bin histogram whose edges are the training deciles. Updating
+    is O(1) in the number of records seen; quantiles and PSI are read off the
+    histogram.
+    """
+
+    def __init__(self, edges, expected):
+        self.edges = list(edges)
+        self.expected = list(expected)
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.bins = [0] * (len(self.edges) + 1)
+
+    @classmethod
+    def from_reference(cls, values, n_bins=10):
+        edges = np.unique(np.quantile(values, np.linspace(0, 1, n_bins + 1)[1:-1]))
+        counts = np.bincount(np.searchsorted(edges, values, side="right"), minlength=len(edges) + 1)
+        stats = cls(edges.tolist(), (counts / counts.sum()).tolist())
+        stats.reference = {"mean": float(np.mean(values)), "std": float(np.std(values))}
+        return stats
+
+    def update(self, x):
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+        self.min = min(self.min, x)
+        self.max = max(self.max, x)
+        self.bins[bisect_right(self.edges, x)] += 1
+
+    @property
+    def std(self):
+        return math.sqrt(self.m2 / self.n) if self.n else 0.0
+
+    def quantile(self, q):
+        """Approximate quantile by linear interpolation inside the histogram bin."""
+        if not self.n:
+            return None
+        target = q * self.n
+        cumulative = 0
+        for i, count in enumerate(self.bins):
+            if count and cumulative + count >= target:
+                low = self.edges[i - 1] if i > 0 else self.min
+                high = self.edges[i] if i < len(self.edges) else self.max
+                low, high = max(low, self.min), min(high, self.max)
+                return low + (high - low) * (target - cumulative) / count
+            cumulative += count
+        return self.max
+
+    def report(self):
+        psi = _psi(self.bins, self.expected)
+        ref = self.reference
+        return {
+            "count": self.n,
+            "mean": self.mean,
+            "std": self.std,
+            "min": self.min if self.n else None,
+            "max": self.max if self.n else None,
+            "quantiles": {f"p{int(q * 100):02d}": self.quantile(q) for q in QUANTILES},
+            "reference_mean": ref["mean"],
+            "reference_std": ref["std"],
+            # Shift of the live mean in training standard deviations
+            "mean_shift": (self.mean - ref["mean"]) / ref["std"] if self.n and ref["std"] else 0.0,
+            "psi": psi,
+            "drift": _level(psi),
+        }
+
+    def state(self):
+        # min/max are +-inf until the first record; JSON has no infinity, so store null
+        return {"n": self.n, "mean": self.mean, "m2": self.m2,
+                "min": self.min if self.n else None, "max": self.max if self.n else None,
+                "bins": self.bins}
+
+    def restore(self, state):
+        if len(state["bins"]) != len(self.bins):
+            raise ValueError("checkpoint was written with different histogram edges")
+        self.n, self.mean, self.m2 = state["n"], state["mean"], state["m2"]
+        self.min = math.inf if state["min"] is None else state["min"]
+        self.max = -math.inf if state["max"] is None else state["max"]
+        self.bins = list(state["bins"])
+
+
+class DriftMonitor:
+    """
+    Incremental input/prediction monitor for the Iris API.
+
+    Keeps FeatureStats per feature and predicted-class counters, compares
+    them with the training split from data.py, and checkpoints its compact
+    state to JSON every `checkpoint_every` records instead of rescanning
+    prediction_log.csv.
+    """
+
+    def __init__(self, state_path=STATE_PATH, checkpoint_every=100):
+        X, y = load_data()
+        X_train, _, y_train, _ = split_data(X, y)
+        self.features = {name: FeatureStats.from_reference(X_train[:, i]) for i, name in enumerate(FEATURE_NAMES)}
+        classes, counts = np.unique(y_train, return_counts=True)
+        self.classes = [int(c) for c in classes]
+        self.class_expected = (counts / counts.sum()).tolist()
+        self.class_counts = [0] * len(self.classes)
+
+        self.state_path = Path(state_path)
+        self.checkpoint_every = checkpoint_every
+        self._since_checkpoint = 0
+        self._lock = threading.Lock()
+        if self.state_path.exists():
+            self.restore()
+
+    @property
+    def count(self):
+        return sum(self.class_counts)
+
+    def update(self, features, predicted_class):
+        """Fold one prediction (feature row + predicted class) into the running state."""
+        with self._lock:
+            for stats, value in zip(self.features.values(), features):
+                stats.update(float(value))
+            if predicted_class in self.classes:
+                self.class_counts[self.classes.index(predicted_class)] += 1
+            self._since_checkpoint += 1
+            if self._since_checkpoint >= self.checkpoint_every:
+                self._checkpoint()
+
+    def report(self):
+        with self._lock:
+            features = {name: stats.report() for name, stats in self.features.items()}
+            class_psi = _psi(self.class_counts, self.class_expected)
+            total = self.count
+            return {
+                "count": total,
+                "features": features,
+                "classes": {
+                    "counts": dict(zip(map(str, self.classes), self.class_counts)),
+                    "frequencies": {str(c): n / total if total else 0.0
+                                    for c, n in zip(self.classes, self.class_counts)},
+                    "reference_frequencies": dict(zip(map(str, self.classes), self.class_expected)),
+                    "psi": class_psi,
+                    "drift": _level(class_psi),
+                },
+                "drift": max((_level(p) for p in [class_psi] + [f["psi"] for f in features.values()]),
+                             key=["none", "moderate", "significant"].index),
+            }
+
+    def checkpoint(self):
+        with self._lock:
+            self._checkpoint()
+
+    def _checkpoint(self):
+        state = {
+            "features": {name: stats.state() for name, stats in self.features.items()},
+            "class_counts": dict(zip(map(str, self.classes), self.class_counts)),
+        }
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+        self._since_checkpoint = 0
+
+    def restore(self):
+        with open(self.state_path) as f:
+            state = json.load(f)
+        for name, stats in self.features.items():
+            stats.restore(state["features"][name])
+        self.class_counts = [state["class_counts"].get(str(c), 0) for c in self.classes]
+
+    def reset(self):
+        with self._lock:
+            for stats in self.features.values():
+                stats.restore({"n": 0, "mean": 0.0, "m2": 0.0, "min": None, "max": None,
+                               "bins": [0] * len(stats.bins)})
+            self.class_counts = [0] * len(self.classes)
+            self._checkpoint()
+
+    def backfill(self, log_path):
+        """One-time import of an existing prediction_log.csv."""
+        rows = 0
+        with open(log_path, newline="") as f:
+            for record in csv.DictReader(f):
+                for features in json.loads(record["features"]):
+                    self.update(features, int(record["predicted_class"]))
+                    rows += 1
+        self.checkpoint()
+        return rows
+
+
+if __name__ == "__main__":
+    from predict import LOG_PATH
+
+    parser = argparse.ArgumentParser(description="Iris prediction drift monitor.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("backfill", help="Rebuild the monitor state from prediction_log.csv")
+    sub.add_parser("report", help="Print the current drift report")
+    args = parser.parse_args()
+
+    monitor = DriftMonitor()
+    if args.command == "backfill":
+        monitor.reset()
+        print(f"✅ Folded {monitor.backfill(LOG_PATH)} logged predictions into {monitor.state_path}")
+    print(json.dumps(monitor.report(), indent=2))
@@ -3,11 +3,22 @@ import numpy as np
 import csv
 from datetime import datetime
 from pathlib import Path
+from monitor import DriftMonitor
 
 # Paths
 MODEL_PATH = Path(__file__).resolve().parent.parent / "model" / "iris_model.pkl"
 LOG_PATH = Path(__file__).resolve().parent.parent / "model" / "prediction_log.csv"
 
+_monitor = None
+
+
+def get_monitor():
+    """Process-wide drift monitor, created (and restored from its checkpoint) on first use."""
+    global _monitor
+    if _monitor is None:
+        _monitor = DriftMonitor()
+    return _monitor
+
 def load_model():
     """Load the trained model from disk."""
     return joblib.load(MODEL_PATH)
@@ -30,8 +41,9 @@ def predict_data(X):
     # Ensure numpy array -> plain list of floats
     y_proba = [float(p) for p in np.array(y_proba)]
 
-    # Log the request and prediction
+    # Log the request and prediction, and fold it into the running drift statistics
     log_prediction(X, y_pred, y_proba)
+    get_monitor().update(np.asarray(X)[0], int(y_pred))
 
     return {
         "class": int(y_pred),
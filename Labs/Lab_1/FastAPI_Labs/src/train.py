@@ -1,19 +1,35 @@
+import os
+import sys
 from sklearn.tree import DecisionTreeClassifier
 import joblib
 from data import load_data, split_data
 
+# Shared helpers live in Labs/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
+from common.profiling import profile_run, stage
+
+MODEL_DIR = "../model"
+
+
 def fit_model(X_train, y_train):
     """
     Train a Decision Tree Classifier and save the model to a file.
+    The stage profile (profile.json + trace.json) is saved next to the model.
     Args:
         X_train (numpy.ndarray): Training features.
         y_train (numpy.ndarray): Training target values.
     """
-    dt_classifier = DecisionTreeClassifier(max_depth=3, random_state=12)
-    dt_classifier.fit(X_train, y_train)
-    joblib.dump(dt_classifier, "../model/iris_model.pkl")
+    with profile_run("fit_model", out_dir=MODEL_DIR, prefix="iris_model_"):
+        with stage("fit"):
+            dt_classifier = DecisionTreeClassifier(max_depth=3, random_state=12)
+            dt_classifier.fit(X_train, y_train)
+        with stage("save"):
+            joblib.dump(dt_classifier, os.path.join(MODEL_DIR, "iris_model.pkl"))
 
 if __name__ == "__main__":
-    X, y = load_data()
-    X_train, X_test, y_train, y_test = split_data(X, y)
-    fit_model(X_train, y_train)
+    with profile_run("iris_decision_tree", out_dir=MODEL_DIR, prefix="iris_model_"):
+        with stage("load"):
+            X, y = load_data()
+        with stage("preprocess"):
+            X_train, X_test, y_train, y_test = split_data(X, y)
+        fit_model(X_train, y_train)
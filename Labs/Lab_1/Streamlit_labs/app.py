@@ -1,6 +1,17 @@
+import os
+import json
 import streamlit as st
 import pandas as pd
 import joblib
+from utils import preprocess
+from utils.encoding import build_category_codes, encode_frame, load_category_codes
+from utils.forest_runtime import CompactForest
+from utils.scenarios import build_scenario_grid, score_scenarios
+
+DATA_DIR = "data"
+INSIGHTS_PATH = "data/salary_insights.json"
+CATEGORY_CODES_PATH = "models/category_codes.json"
+FOREST_DIR = "models/salary_forest"
 
 # --------------------------------------------------------
 # Must come first
@@ -12,19 +23,47 @@ st.set_page_config(page_title="Job Salary Prediction App", layout="centered")
 # --------------------------------------------------------
 @st.cache_resource
 def load_model():
+    """Prefer the memory-mapped forest export; fall back to the pickled model."""
+    if os.path.exists(os.path.join(FOREST_DIR, "meta.json")):
+        return CompactForest.load(FOREST_DIR)
     return joblib.load("models/salary_model.pkl")
 
 @st.cache_data
-def load_data():
-    return pd.read_csv("data/cleaned_data.csv")
+def load_data(path):
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+def insights_source():
+    """(path, mtime, size) of the insights source; a cheap cache key on every rerun."""
+    path = INSIGHTS_PATH if os.path.exists(INSIGHTS_PATH) else preprocess.cleaned_data_path(DATA_DIR)
+    stat = os.stat(path)
+    return path, stat.st_mtime_ns, stat.st_size
+
+@st.cache_data
+def load_insights(source):
+    """Pre-aggregated chart data, so reruns never group the full dataset."""
+    if source[0] == INSIGHTS_PATH:
+        with open(INSIGHTS_PATH) as f:
+            insights = json.load(f)
+    else:
+        # preprocess.py has not written salary_insights.json yet
+        insights = preprocess.compute_insights(load_data(source[0]))
+    return {
+        name: pd.Series(values, index=[int(k) for k in values], dtype=float)
+        for name, values in insights.items()
+    }
 
 @st.cache_resource
-def load_encoders():
-    return joblib.load("models/label_encoders.pkl")
+def load_category_codes_table():
+    """{column: {category: code}} lookup tables exported by preprocess.py."""
+    if os.path.exists(CATEGORY_CODES_PATH):
+        return load_category_codes(CATEGORY_CODES_PATH)
+    return build_category_codes(joblib.load("models/label_encoders.pkl"))
 
 model = load_model()
-data = load_data()
-encoders = load_encoders()
+category_codes = load_category_codes_table()
+insights = load_insights(insights_source())
 
 # --------------------------------------------------------
 # Streamlit UI
@@ -39,19 +78,6 @@ This app uses a Random Forest model trained on the
 [Data Science Job Salaries 2023 dataset](https://www.kaggle.com/datasets/arnabchaki/data-science-salaries-2023).
 """)
 
-# --------------------------------------------------------
-# Helper function to encode
-# --------------------------------------------------------
-def encode_value(column, label):
-    """Return encoded numeric value for a category using saved encoders"""
-    le = encoders.get(column)
-    if le:
-        try:
-            return le.transform([label])[0]
-        except ValueError:
-            return 0
-    return label
-
 # --------------------------------------------------------
 # Input Form
 # --------------------------------------------------------
@@ -60,33 +86,52 @@ st.subheader("Input Job Details")
 col1, col2 = st.columns(2)
 
 with col1:
-    job_title_text = st.selectbox("Job Title", encoders["job_title"].classes_)
-    experience_text = st.selectbox("Experience Level", encoders["experience_level"].classes_)
-    employment_text = st.selectbox("Employment Type", encoders["employment_type"].classes_)
+    job_title_text = st.selectbox("Job Title", list(category_codes["job_title"]))
+    experience_text = st.selectbox("Experience Level", list(category_codes["experience_level"]))
+    employment_text = st.selectbox("Employment Type", list(category_codes["employment_type"]))
 
 with col2:
-    company_loc_text = st.selectbox("Company Location", encoders["company_location"].classes_)
-    company_size_text = st.selectbox("Company Size", encoders["company_size"].classes_)
+    company_loc_text = st.selectbox("Company Location", list(category_codes["company_location"]))
+    company_size_text = st.selectbox("Company Size", list(category_codes["company_size"]))
     remote_ratio = st.slider("Remote Ratio (0 = Onsite, 100 = Fully Remote)", 0, 100, 50)
 
 # --------------------------------------------------------
 # Predict Salary
 # --------------------------------------------------------
 if st.button("🔍 Predict Salary"):
-    input_data = pd.DataFrame({
-        "work_year": [2023],
-        "experience_level": [encode_value("experience_level", experience_text)],
-        "employment_type": [encode_value("employment_type", employment_text)],
-        "job_title": [encode_value("job_title", job_title_text)],
-        "employee_residence": [encode_value("company_location", company_loc_text)],
-        "remote_ratio": [remote_ratio],
-        "company_location": [encode_value("company_location", company_loc_text)],
-        "company_size": [encode_value("company_size", company_size_text)]
-    })
+    input_data = encode_frame(pd.DataFrame([{
+        "work_year": 2023,
+        "experience_level": experience_text,
+        "employment_type": employment_text,
+        "job_title": job_title_text,
+        "employee_residence": company_loc_text,
+        "remote_ratio": remote_ratio,
+        "company_location": company_loc_text,
+        "company_size": company_size_text
+    }]), category_codes)
 
     prediction = model.predict(input_data)[0]
     st.success(f"💰 **Estimated Salary:** ${prediction:,.0f} USD")
 
+# --------------------------------------------------------
+# What-if Scenarios
+# --------------------------------------------------------
+@st.cache_data
+def salary_scenarios(job_title, employment_type, company_location, company_size):
+    """Salary for every experience level x remote ratio, scored in one batch per input combination."""
+    grid = build_scenario_grid({
+        "job_title": job_title,
+        "employment_type": employment_type,
+        "company_location": company_location,
+        "company_size": company_size,
+    }, list(category_codes["experience_level"]))
+    scenarios = score_scenarios(model, grid, category_codes)
+    return scenarios.pivot(index="remote_ratio", columns="experience_level", values="predicted_salary")
+
+st.divider()
+st.subheader("📈 What-if: Remote Ratio x Experience Level")
+st.line_chart(salary_scenarios(job_title_text, employment_text, company_loc_text, company_size_text))
+
 # --------------------------------------------------------
 # Visuals
 # --------------------------------------------------------
@@ -96,11 +141,9 @@ st.subheader("📊 Salary Insights")
 tab1, tab2 = st.tabs(["Average Salary by Job Title", "Remote Work Impact"])
 
 with tab1:
-    avg_salary_by_job = data.groupby("job_title")["salary_in_usd"].mean().sort_values(ascending=False).head(10)
-    st.bar_chart(avg_salary_by_job)
+    st.bar_chart(insights["avg_salary_by_job"])
 
 with tab2:
-    avg_remote = data.groupby("remote_ratio")["salary_in_usd"].mean()
-    st.line_chart(avg_remote)
+    st.line_chart(insights["avg_salary_by_remote"])
 
 st.caption("© 2025 Job Salary Prediction | Streamlit Demo App")
@@ -0,0 +1,152 @@
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+import numpy as np
+import pandas as pd
+import joblib
+
+FOREST_DIR = "models/salary_forest"
+
+# Snippets timed in a fresh interpreter so imports and loading are measured cold
+COLD_START = {
+    "joblib": (
+        "import joblib\n"
+        "model = joblib.load({model_path!r})\n"
+    ),
+    "compact": (
+        "import sys\n"
+        "sys.path.insert(0, {root!r})\n"
+        "from utils.forest_runtime import CompactForest\n"
+        "model = CompactForest.load({forest_dir!r})\n"
+    ),
+}
+
+
+def _threshold_float32(threshold):
+    """
+    Cast float64 split thresholds to float32 without changing any decision.
+
+    Features are compared as float32, so rounding each threshold down to the
+    nearest float32 keeps `x <= threshold` identical for every float32 x.
+    """
+    t32 = threshold.astype(np.float32)
+    too_high = t32.astype(np.float64) > threshold
+    t32[too_high] = np.nextafter(t32[too_high], np.float32(-np.inf))
+    return t32
+
+
+def export_forest(model, out_dir: str = FOREST_DIR):
+    """
+    Flatten a fitted RandomForestRegressor into memory-mappable node arrays.
+
+    Child indices are global (offset per tree) int32, leaves have feature -1,
+    thresholds are float32. Leaf values are stored as float32 only when that
+    is lossless, so predictions stay exact.
+    """
+    trees = [est.tree_ for est in model.estimators_]
+    offsets = np.cumsum([0] + [t.node_count for t in trees[:-1]])
+
+    feature, threshold, children, value = [], [], [], []
+    for offset, tree in zip(offsets, trees):
+        is_leaf = tree.children_left < 0
+        feature.append(np.where(is_leaf, -1, tree.feature))
+        threshold.append(tree.threshold)
+        # Column 0 is taken when x > threshold, column 1 when x <= threshold
+        children.append(np.where(
+            is_leaf[:, None], -1,
+            np.stack([tree.children_right, tree.children_left], axis=1) + offset,
+        ))
+        value.append(tree.value[:, 0, 0])
+
+    value = np.concatenate(value)
+    value32 = value.astype(np.float32)
+    arrays = {
+        "feature": np.concatenate(feature).astype(np.int32),
+        "threshold": _threshold_float32(np.concatenate(threshold)),
+        "children": np.concatenate(children).astype(np.int32),
+        "value": value32 if np.array_equal(value32.astype(np.float64), value) else value,
+        "roots": offsets.astype(np.int32),
+    }
+
+    os.makedirs(out_dir, exist_ok=True)
+    for name, array in arrays.items():
+        np.save(os.path.join(out_dir, f"{name}.npy"), array)
+    meta = {
+        "n_trees": len(trees),
+        "n_nodes": int(arrays["feature"].shape[0]),
+        "max_depth": int(max(t.max_depth for t in trees)),
+        "feature_names": [str(c) for c in getattr(model, "feature_names_in_", [])] or None,
+    }
+    with open(os.path.join(out_dir, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+
+    size = sum(os.path.getsize(os.path.join(out_dir, f"{name}.npy")) for name in arrays)
+    print(f"🌲 Exported {meta['n_trees']} trees / {meta['n_nodes']:,} nodes to {out_dir} ({size / 1e6:.1f} MB)")
+    return meta
+
+
+def _cold_start(kind, model_path, forest_dir):
+    """Load time and peak RSS of a fresh interpreter that only loads the model."""
+    code = (
+        "import time, resource, sys\n"
+        "start = time.perf_counter()\n"
+        + COLD_START[kind].format(model_path=model_path, forest_dir=forest_dir, root=os.getcwd())
+        + "elapsed = time.perf_counter() - start\n"
+        "try:\n"
+        "    # VmHWM is reset by exec, unlike ru_maxrss on Linux\n"
+        "    status = open('/proc/self/status').read()\n"
+        "    rss_mb = int(status.split('VmHWM:')[1].split()[0]) / 1024\n"
+        "except OSError:\n"
+        "    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024)\n"
+        "print(elapsed, rss_mb)\n"
+    )
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    elapsed, rss_mb = output.stdout.split()
+    return float(elapsed), float(rss_mb)
+
+
+def benchmark(model_path: str, forest_dir: str, data_path: str, rows: int = 100_000):
+    """Compare cold start, peak RSS and predictions/sec against sklearn, and check parity."""
+    from utils.forest_runtime import CompactForest
+
+    model = joblib.load(model_path)
+    model.n_jobs = 1  # sklearn sums trees in a fixed order only when single-threaded
+    forest = CompactForest.load(forest_dir)
+
+    X = pd.read_csv(data_path).drop(columns=["salary_in_usd"])
+    X = pd.concat([X] * (rows // len(X) + 1), ignore_index=True).iloc[:rows]
+
+    results = {}
+    for kind, predictor in (("joblib", model), ("compact", forest)):
+        load_s, rss_mb = _cold_start(kind, model_path, forest_dir)
+        start = time.perf_counter()
+        predictions = predictor.predict(X)
+        elapsed = time.perf_counter() - start
+        results[kind] = predictions
+        print(f"{kind:<8} cold start {load_s:6.3f}s | peak RSS {rss_mb:7.1f} MiB | "
+              f"{len(X) / elapsed:12,.0f} predictions/s")
+
+    if not np.array_equal(results["joblib"], results["compact"]):
+        diff = np.abs(results["joblib"] - results["compact"]).max()
+        raise AssertionError(f"❌ Compact forest predictions differ (max abs diff {diff})")
+    print(f"✅ Predictions identical on {len(X):,} rows")
+
+
+if __name__ == "__main__":
+    # Allow `python models/export_forest.py` from the project root
+    sys.path.insert(0, os.getcwd())
+
+    parser = argparse.ArgumentParser(description="Export the salary RandomForest to compact arrays.")
+    parser.add_argument("--model", type=str, default="models/salary_model.pkl")
+    parser.add_argument("--out", type=str, default=FOREST_DIR)
+    parser.add_argument("--bench", action="store_true", help="Benchmark against joblib/sklearn after export")
+    parser.add_argument("--data", type=str, default="data/cleaned_data.csv")
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    export_forest(joblib.load(args.model), args.out)
+    if args.bench:
+        benchmark(args.model, args.out, args.data, args.rows)
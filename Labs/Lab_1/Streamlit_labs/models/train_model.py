@@ -4,6 +4,14 @@ from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_absolute_error, r2_score
 import joblib
 import os
+import sys
+from export_forest import export_forest
+
+# Shared helpers live in Labs/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
+from common.profiling import profile_run, stage
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from utils.preprocess import cleaned_data_path
 
 def train_salary_model(data_path: str, model_path: str):
     """
@@ -16,48 +24,67 @@ def train_salary_model(data_path: str, model_path: str):
     4. Train RandomForest model
     5. Evaluate metrics
     6. Save model as .pkl
+
+    Wall/CPU time and peak RSS of each step are saved next to the model.
     """
 
-    # Load the processed data
-    df = pd.read_csv(data_path)
+    # Stage profile (profile.json + trace.json) is written next to the model
+    prefix = os.path.splitext(os.path.basename(model_path))[0] + "_"
+    with profile_run("streamlit_salary_model", out_dir=os.path.dirname(model_path) or ".", prefix=prefix):
+        return _train_salary_model(data_path, model_path)
+
 
-    # Separate features and target
-    X = df.drop(columns=["salary_in_usd"])
-    y = df["salary_in_usd"]
+def _train_salary_model(data_path: str, model_path: str):
+    # Load the processed data (typed Parquet from the streamed preprocessor, or CSV)
+    with stage("load"):
+        if data_path.endswith(".parquet"):
+            df = pd.read_parquet(data_path)
+        else:
+            df = pd.read_csv(data_path)
 
-    # Split data
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42
-    )
+    with stage("preprocess"):
+        # Separate features and target
+        X = df.drop(columns=["salary_in_usd"])
+        y = df["salary_in_usd"]
+
+        # Split data
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=0.2, random_state=42
+        )
 
     # Train model
-    model = RandomForestRegressor(
-        n_estimators=200,
-        random_state=42,
-        n_jobs=-1
-    )
-    model.fit(X_train, y_train)
+    with stage("fit"):
+        model = RandomForestRegressor(
+            n_estimators=200,
+            random_state=42,
+            n_jobs=-1
+        )
+        model.fit(X_train, y_train)
 
     # Evaluate performance
-    y_pred = model.predict(X_test)
-    mae = mean_absolute_error(y_test, y_pred)
-    r2 = r2_score(y_test, y_pred)
+    with stage("evaluate"):
+        y_pred = model.predict(X_test)
+        mae = mean_absolute_error(y_test, y_pred)
+        r2 = r2_score(y_test, y_pred)
 
     print("✅ Model training complete.")
     print(f"📊 Mean Absolute Error: {mae:,.2f}")
     print(f"📈 R² Score: {r2:.3f}")
 
-    # Create model directory if not exists
-    os.makedirs(os.path.dirname(model_path), exist_ok=True)
-
-    # Save model
-    joblib.dump(model, model_path)
+    # Create model directory if not exists and save model
+    with stage("save"):
+        os.makedirs(os.path.dirname(model_path), exist_ok=True)
+        joblib.dump(model, model_path)
     print(f"💾 Model saved to {model_path}")
 
     return model, mae, r2
 
 
 if __name__ == "__main__":
-    data_path = "data/cleaned_data.csv"
+    # Whichever preprocessing mode ran last
+    data_path = cleaned_data_path("data")
     model_path = "models/salary_model.pkl"
-    train_salary_model(data_path, model_path)
+    model, _, _ = train_salary_model(data_path, model_path)
+
+    # Compact, memory-mappable copy used by the Streamlit app
+    export_forest(model, "models/salary_forest")
@@ -0,0 +1,55 @@
+import json
+import pandas as pd
+
+# Code used for categories the encoders never saw during preprocessing
+UNKNOWN_CODE = -1
+
+# Column order the salary model was trained on
+FEATURE_COLUMNS = [
+    "work_year",
+    "experience_level",
+    "employment_type",
+    "job_title",
+    "employee_residence",
+    "remote_ratio",
+    "company_location",
+    "company_size"
+]
+
+
+def build_category_codes(encoders):
+    """
+    Turn fitted LabelEncoders into plain {column: {category: code}} tables.
+
+    Codes follow the order of LabelEncoder.classes_, so they are identical to
+    what LabelEncoder.transform would return.
+    """
+    return {
+        col: {str(label): code for code, label in enumerate(le.classes_)}
+        for col, le in encoders.items()
+    }
+
+
+def save_category_codes(codes, path: str):
+    with open(path, "w") as f:
+        json.dump(codes, f, indent=2)
+    print(f"💾 Category code tables saved to {path}")
+
+
+def load_category_codes(path: str):
+    with open(path) as f:
+        return json.load(f)
+
+
+def encode_frame(df: pd.DataFrame, codes) -> pd.DataFrame:
+    """
+    Encode raw category labels into model-ready codes for every row at once.
+
+    Each categorical column is mapped through its lookup table in one
+    vectorized step; labels missing from a table become UNKNOWN_CODE.
+    """
+    encoded = df.copy()
+    for col, table in codes.items():
+        if col in encoded.columns:
+            encoded[col] = encoded[col].map(table).fillna(UNKNOWN_CODE).astype("int64")
+    return encoded[FEATURE_COLUMNS]
@@ -0,0 +1,85 @@
+import os
+import json
+import numpy as np
+
+FOREST_ARRAYS = ("feature", "threshold", "children", "value", "roots")
+
+
+class CompactForest:
+    """
+    NumPy-only batch predictor for an exported RandomForestRegressor.
+
+    All trees live in flat node arrays (int32 children/features, float32
+    thresholds) stored as .npy files. Leaves have feature -1, and row i of
+    `children` is [right, left] so the next node is children[i, x <= t].
+    The arrays are plain .npy files, so a forest can be memory-mapped and
+    shared between processes instead of unpickled into every worker.
+    Predictions are bit-for-bit identical to RandomForestRegressor.predict
+    with n_jobs=1.
+    """
+
+    def __init__(self, arrays, meta):
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.children = arrays["children"].reshape(-1)
+        self.value = arrays["value"]
+        self.roots = arrays["roots"]
+        self.meta = meta
+        self.feature_names = meta.get("feature_names")
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True):
+        """Open an exported forest directory, memory-mapping the node arrays by default."""
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        mode = "r" if mmap else None
+        arrays = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mode)
+            for name in FOREST_ARRAYS
+        }
+        return cls(arrays, meta)
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    def predict(self, X, batch_size: int = 4096):
+        """Predict a 2D array or DataFrame in the training column order."""
+        if self.feature_names is not None and hasattr(X, "columns"):
+            X = X[self.feature_names]
+        # sklearn trees compare float32 features, so cast the same way
+        X = np.asarray(X, dtype=np.float32)
+        out = np.empty(len(X), dtype=np.float64)
+        for start in range(0, len(X), batch_size):
+            out[start:start + batch_size] = self._predict_batch(X[start:start + batch_size])
+        return out
+
+    def _predict_batch(self, X):
+        n_rows, n_features = X.shape
+        flat_X = X.ravel()
+        # One cursor per (row, tree); cursors drop out as they reach a leaf
+        node = np.tile(np.asarray(self.roots), n_rows)
+        cursor = np.arange(node.size)
+        offset = np.repeat(np.arange(n_rows, dtype=np.int64) * n_features, self.n_trees)
+        current = node
+        feature = self.feature[current]
+        # A depth-0 tree's root is already its leaf, so those cursors start finished
+        keep = feature >= 0
+        cursor, current, feature, offset = cursor[keep], current[keep], feature[keep], offset[keep]
+        while cursor.size:
+            go_left = flat_X[offset + feature] <= self.threshold[current]
+            current = self.children[2 * current + go_left]
+            feature = self.feature[current]
+            leaf = feature < 0
+            if leaf.any():
+                node[cursor[leaf]] = current[leaf]
+                keep = ~leaf
+                cursor, current, feature, offset = cursor[keep], current[keep], feature[keep], offset[keep]
+
+        leaf_values = self.value[node].reshape(n_rows, self.n_trees)
+        # Accumulate tree by tree, in the same order as sklearn, for identical rounding
+        total = np.zeros(n_rows, dtype=np.float64)
+        for tree in range(self.n_trees):
+            total += leaf_values[:, tree]
+        total /= self.n_trees
+        return total
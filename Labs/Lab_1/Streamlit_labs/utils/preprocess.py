@@ -1,7 +1,41 @@
+import os
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+import numpy as np
 import pandas as pd
 from sklearn.preprocessing import LabelEncoder
 import joblib
 
+# Shared helpers live in Labs/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
+from common.profiling import StageProfiler
+
+try:
+    from utils.encoding import FEATURE_COLUMNS, build_category_codes, save_category_codes
+except ImportError:  # run directly as utils/preprocess.py
+    from encoding import FEATURE_COLUMNS, build_category_codes, save_category_codes
+
+# Categorical columns to encode
+CATEGORICAL_COLUMNS = [
+    "experience_level",
+    "employment_type",
+    "job_title",
+    "employee_residence",
+    "company_location",
+    "company_size"
+]
+
+# Explicit dtypes for the streamed reader (salary/salary_currency are never read)
+RAW_DTYPES = {
+    "work_year": "int16",
+    "remote_ratio": "int8",
+    "salary_in_usd": "float64",
+    **{col: "category" for col in CATEGORICAL_COLUMNS},
+}
+
 def preprocess_data(input_path: str, output_path: str):
     """
     Preprocess the raw salary dataset and save a cleaned CSV for model training.
@@ -25,18 +59,8 @@ def preprocess_data(input_path: str, output_path: str):
     df = df.dropna(subset=["salary_in_usd"])  # target variable
     df = df.fillna("Unknown")
 
-    # Categorical columns to encode
-    categorical_cols = [
-        "experience_level",
-        "employment_type",
-        "job_title",
-        "employee_residence",
-        "company_location",
-        "company_size"
-    ]
-
     encoders = {}
-    for col in categorical_cols:
+    for col in CATEGORICAL_COLUMNS:
         le = LabelEncoder()
         df[col] = le.fit_transform(df[col])
         encoders[col] = le
@@ -52,15 +76,160 @@ def preprocess_data(input_path: str, output_path: str):
     return df, encoders
 
 
+def compute_insights(df: pd.DataFrame, top_n: int = 10):
+    """
+    Pre-aggregate the salary insight charts shown in the Streamlit app.
+
+    Returns a JSON-serializable dict with the top job titles by average
+    salary and the average salary per remote ratio, keyed by the encoded
+    category.
+    """
+    return _format_insights(
+        df.groupby("job_title")["salary_in_usd"].mean(),
+        df.groupby("remote_ratio")["salary_in_usd"].mean(),
+        top_n,
+    )
+
+
+def _format_insights(by_job: pd.Series, by_remote: pd.Series, top_n: int = 10):
+    by_job = by_job.sort_values(ascending=False).head(top_n)
+    return {
+        "avg_salary_by_job": {str(k): float(v) for k, v in by_job.items()},
+        "avg_salary_by_remote": {str(k): float(v) for k, v in by_remote.items()},
+    }
+
+
+def _scan_vocabularies(input_path: str, chunksize: int, repeat: int = 1):
+    """First pass: collect the sorted category vocabulary of every column, chunk by chunk."""
+    seen = {col: set() for col in CATEGORICAL_COLUMNS}
+    for _ in range(repeat):
+        for chunk in pd.read_csv(input_path, usecols=CATEGORICAL_COLUMNS + ["salary_in_usd"],
+                                 dtype=RAW_DTYPES, chunksize=chunksize):
+            chunk = chunk.dropna(subset=["salary_in_usd"])
+            for col in CATEGORICAL_COLUMNS:
+                seen[col].update(chunk[col].dropna().unique())
+                if chunk[col].isna().any():
+                    seen[col].add("Unknown")
+    # Sorted vocabularies give exactly the codes LabelEncoder would assign
+    return {col: sorted(values) for col, values in seen.items()}
+
+
+def preprocess_data_streamed(input_path: str, output_path: str, chunksize: int = 100_000, repeat: int = 1):
+    """
+    Memory-bounded variant of preprocess_data that writes typed Parquet.
+
+    Reads only the needed columns in chunks with explicit dtypes (categoricals
+    as pandas categories), builds the category vocabularies incrementally and
+    writes integer category codes chunk by chunk, so peak memory depends on
+    the chunk size rather than the file size. Codes match preprocess_data.
+    `repeat` re-reads the input N times to simulate an N-times larger dataset.
+
+    Returns the fitted encoders and the salary insights computed on the fly.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    vocab = _scan_vocabularies(input_path, chunksize, repeat)
+    code_dtype = {
+        col: np.int16 if len(values) < np.iinfo(np.int16).max else np.int32
+        for col, values in vocab.items()
+    }
+
+    job_sum, job_count = pd.Series(dtype=float), pd.Series(dtype=float)
+    remote_sum, remote_count = pd.Series(dtype=float), pd.Series(dtype=float)
+    rows = 0
+    writer = None
+    try:
+        for _ in range(repeat):
+            for chunk in pd.read_csv(input_path, usecols=list(RAW_DTYPES), dtype=RAW_DTYPES,
+                                     chunksize=chunksize):
+                chunk = chunk.dropna(subset=["salary_in_usd"])
+                for col in CATEGORICAL_COLUMNS:
+                    labels = chunk[col].astype(object).fillna("Unknown")
+                    chunk[col] = pd.Categorical(labels, categories=vocab[col]).codes.astype(code_dtype[col])
+                chunk = chunk[FEATURE_COLUMNS + ["salary_in_usd"]]
+
+                # Running sums for the app's insight charts
+                grouped = chunk.groupby("job_title")["salary_in_usd"]
+                job_sum = job_sum.add(grouped.sum(), fill_value=0)
+                job_count = job_count.add(grouped.count(), fill_value=0)
+                grouped = chunk.groupby("remote_ratio")["salary_in_usd"]
+                remote_sum = remote_sum.add(grouped.sum(), fill_value=0)
+                remote_count = remote_count.add(grouped.count(), fill_value=0)
+
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(output_path, table.schema)
+                writer.write_table(table)
+                rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    print(f"✅ Cleaned data saved to {output_path} ({rows:,} rows)")
+
+    encoders = {}
+    for col, values in vocab.items():
+        le = LabelEncoder()
+        le.fit(values)
+        encoders[col] = le
+    insights = _format_insights(job_sum / job_count, remote_sum / remote_count)
+    return encoders, insights
+
+
+def cleaned_data_path(data_dir: str = "data"):
+    """
+    The cleaned dataset written last: cleaned_data.parquet (streamed mode)
+    or cleaned_data.csv (default mode), whichever is newer.
+    """
+    paths = [os.path.join(data_dir, name) for name in ("cleaned_data.parquet", "cleaned_data.csv")]
+    existing = [p for p in paths if os.path.exists(p)]
+    return max(existing, key=os.path.getmtime) if existing else paths[-1]
+
+
+def save_insights(insights, path: str):
+    """Write the pre-aggregated insights next to the cleaned data."""
+    with open(path, "w") as f:
+        json.dump(insights, f, indent=2)
+    print(f"📊 Salary insights saved to {path}")
 
-import joblib
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Preprocess the salary dataset.")
+    parser.add_argument("--streamed", action="store_true",
+                        help="Chunked, dtype-aware preprocessing that writes Parquet")
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="Streamed mode only: read the input N times to simulate a larger dataset. "
+                             "Benchmark only, output goes to a temporary directory")
+    args = parser.parse_args()
+    if args.repeat > 1 and not args.streamed:
+        parser.error("--repeat requires --streamed")
+
     input_path = "data/salaries.csv"
-    output_path = "data/cleaned_data.csv"
-    df, encoders = preprocess_data(input_path, output_path)
+    # A repeated run is a benchmark: never overwrite the data and encoders training uses
+    bench_dir = tempfile.mkdtemp(prefix="salary_bench_") if args.repeat > 1 else None
+    # Peak RSS rather than tracemalloc: the pandas C parser and the Arrow buffers live outside the Python heap
+    with StageProfiler("salary_preprocess", out_dir=None) as profiler:
+        if args.streamed:
+            output_path = os.path.join(bench_dir, "cleaned_data.parquet") if bench_dir else "data/cleaned_data.parquet"
+            encoders, insights = preprocess_data_streamed(input_path, output_path, args.chunksize, args.repeat)
+        else:
+            output_path = "data/cleaned_data.csv"
+            df, encoders = preprocess_data(input_path, output_path)
+            insights = compute_insights(df)
+    summary = profiler.summary()
+    print(f"⏱️ Preprocessing took {summary['wall_s']:.2f}s, peak RSS {summary['peak_rss_mb']:.1f} MiB")
+
+    if bench_dir:
+        shutil.rmtree(bench_dir)
+        print("🧪 Benchmark run (--repeat): data/ and models/ were left untouched")
+        sys.exit(0)
+
+    save_insights(insights, "data/salary_insights.json")
 
     # Save encoders for use in the Streamlit app
     joblib.dump(encoders, "models/label_encoders.pkl")
     print("💾 Encoders saved to models/label_encoders.pkl")
 
+    # Plain dict lookup tables for fast encoding in the app
+    save_category_codes(build_category_codes(encoders), "models/category_codes.json")
@@ -0,0 +1,86 @@
+import os
+import sys
+import time
+import argparse
+import pandas as pd
+import joblib
+
+try:
+    from utils.encoding import encode_frame, load_category_codes
+except ImportError:  # run directly as utils/scenarios.py
+    from encoding import encode_frame, load_category_codes
+
+# Every slider position of the app's remote ratio input
+REMOTE_RATIOS = list(range(0, 101))
+
+
+def build_scenario_grid(base: dict, experience_levels, remote_ratios=REMOTE_RATIOS) -> pd.DataFrame:
+    """
+    Cartesian grid of experience level x remote ratio for one job profile.
+
+    `base` holds the fixed raw inputs (job_title, employment_type,
+    company_location, company_size); the grid is returned with raw labels so
+    it can be encoded in one call to encode_frame.
+    """
+    grid = pd.MultiIndex.from_product(
+        [list(experience_levels), list(remote_ratios)],
+        names=["experience_level", "remote_ratio"],
+    ).to_frame(index=False)
+    grid["work_year"] = base.get("work_year", 2023)
+    for col in ("employment_type", "job_title", "company_location", "company_size"):
+        grid[col] = base[col]
+    # The form has a single location input, used for residence as well
+    grid["employee_residence"] = base.get("employee_residence", base["company_location"])
+    return grid
+
+
+def score_scenarios(model, grid: pd.DataFrame, codes) -> pd.DataFrame:
+    """Encode the whole grid as one matrix and score it with a single predict call."""
+    predictions = model.predict(encode_frame(grid, codes))
+    return grid[["experience_level", "remote_ratio"]].assign(predicted_salary=predictions)
+
+
+def benchmark(model, codes, base: dict, repeats: int = 3):
+    """Time the batched grid against one predict call per scenario."""
+    grid = build_scenario_grid(base, list(codes["experience_level"]))
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        batched = score_scenarios(model, grid, codes)
+    batch_s = (time.perf_counter() - start) / repeats
+
+    start = time.perf_counter()
+    looped = [model.predict(encode_frame(grid.iloc[[i]], codes))[0] for i in range(len(grid))]
+    loop_s = time.perf_counter() - start
+
+    if not (batched["predicted_salary"].to_numpy() == looped).all():
+        raise AssertionError("❌ Batched and looped predictions differ")
+    print(f"📈 {len(grid)} scenarios: batched {batch_s * 1000:.1f} ms | "
+          f"looped {loop_s * 1000:.1f} ms | {loop_s / batch_s:.0f}x faster")
+    return batch_s, loop_s
+
+
+if __name__ == "__main__":
+    # Allow `python utils/scenarios.py` from the project root
+    sys.path.insert(0, os.getcwd())
+    from utils.forest_runtime import CompactForest
+
+    parser = argparse.ArgumentParser(description="Benchmark batched what-if salary scenarios.")
+    parser.add_argument("--job-title", type=str, default="Data Scientist")
+    parser.add_argument("--employment-type", type=str, default="FT")
+    parser.add_argument("--company-location", type=str, default="US")
+    parser.add_argument("--company-size", type=str, default="M")
+    parser.add_argument("--model", choices=["joblib", "compact"], default="joblib")
+    args = parser.parse_args()
+
+    codes = load_category_codes("models/category_codes.json")
+    if args.model == "compact":
+        model = CompactForest.load("models/salary_forest")
+    else:
+        model = joblib.load("models/salary_model.pkl")
+    benchmark(model, codes, {
+        "job_title": args.job_title,
+        "employment_type": args.employment_type,
+        "company_location": args.company_location,
+        "company_size": args.company_size,
+    })
@@ -0,0 +1,343 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.feature_selection import RFE, SelectFromModel, f_classif, mutual_info_classif
+from sklearn.inspection import permutation_importance
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import StratifiedKFold, train_test_split
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+from sklearn.svm import LinearSVC
+
+# Shared helpers live in Labs/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
+from common.cpus import available_cpus
+
+BASE_DIR = Path(__file__).resolve().parent
+DATA_PATH = BASE_DIR / "Data" / "heart_disease_uci.csv"
+CACHE_PATH = BASE_DIR / "Data" / "subset_scores.json"
+CATEGORICAL = ["sex", "cp", "fbs", "restecg", "exang", "slope", "thal"]
+RANDOM_STATE = 42
+
+MODELS = {
+    "rf": lambda n_jobs=1: RandomForestClassifier(random_state=RANDOM_STATE, n_jobs=n_jobs),
+    "logreg": lambda n_jobs=1: make_pipeline(StandardScaler(), LogisticRegression(max_iter=1000)),
+}
+
+
+def load_data(path=DATA_PATH):
+    """
+    Load and clean the dataset exactly as the notebook does: binary target
+    from `num`, drop id/dataset, label-encode text columns, median-fill.
+    """
+    df = pd.read_csv(path)
+    df["target"] = (df["num"] > 0).astype(int)
+    df = df.drop(["num", "id", "dataset"], axis=1)
+    for col in [c for c in df.columns if not pd.api.types.is_numeric_dtype(df[c])]:
+        df[col] = LabelEncoder().fit_transform(df[col].astype(str))
+    df = df.fillna(df.median(numeric_only=True))
+    return df.drop("target", axis=1), df["target"]
+
+
+def _data_digest(X, y):
+    digest = hashlib.sha1(",".join(X.columns).encode())
+    digest.update(np.ascontiguousarray(X.to_numpy(dtype=np.float64)).tobytes())
+    digest.update(np.ascontiguousarray(y.to_numpy(dtype=np.int64)).tobytes())
+    return digest.hexdigest()[:12]
+
+
+# Subset scoring: cross-validation over a process pool, memoized per fold
+
+_WORKER = {}
+
+
+def _init_worker(X, y, columns, folds, model, scoring):
+    _WORKER.update(X=X, y=y, columns={c: i for i, c in enumerate(columns)}, folds=folds,
+                   model=model, scorer=get_scorer(scoring))
+
+
+def _score_fold(subset, fold):
+    cols = [_WORKER["columns"][c] for c in subset]
+    train, test = _WORKER["folds"][fold]
+    X, y = _WORKER["X"][:, cols], _WORKER["y"]
+    estimator = MODELS[_WORKER["model"]]()
+    estimator.fit(X[train], y[train])
+    return _WORKER["scorer"](estimator, X[test], y[test])
+
+
+class SubsetScorer:
+    """
+    Cross-validated score of candidate feature subsets.
+
+    Every (subset, model, fold) score is memoized, in memory and in a JSON
+    file keyed by the data digest, CV settings and scoring, so reruns and
+    searches that revisit or extend earlier subsets only fit what is new.
+    Missing folds are fanned out over a process pool that receives the data
+    once per worker rather than once per task.
+    """
+
+    def __init__(self, X, y, model="rf", folds=5, scoring="f1", workers=None, cache_path=CACHE_PATH):
+        if model not in MODELS:
+            raise ValueError(f"❌ Unknown model '{model}'. Choose from {sorted(MODELS)}")
+        self.X, self.y = X, y
+        self.columns = list(X.columns)
+        self.model, self.scoring, self.n_folds = model, scoring, folds
+        self.workers = workers or available_cpus()
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.prefix = f"{_data_digest(X, y)}|{model}|{scoring}|{folds}|{RANDOM_STATE}"
+        self.folds = list(StratifiedKFold(folds, shuffle=True, random_state=RANDOM_STATE).split(X, y))
+        self.stats = {"hits": 0, "fits": 0}
+        self._pool = None
+        self._dirty = False
+        self._cache = self._load_cache()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _load_cache(self):
+        if self.cache_path and self.cache_path.exists():
+            with open(self.cache_path) as f:
+                return json.load(f).get(self.prefix, {})
+        return {}
+
+    def save(self):
+        if not (self.cache_path and self._dirty):
+            return
+        store = {}
+        if self.cache_path.exists():
+            with open(self.cache_path) as f:
+                store = json.load(f)
+        store[self.prefix] = self._cache
+        tmp_path = self.cache_path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(store, f)
+        os.replace(tmp_path, self.cache_path)
+        self._dirty = False
+
+    def close(self):
+        self.save()
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def canonical(self, subset):
+        """Subsets are keyed in column order, so {a, b} and {b, a} share cache entries."""
+        subset = set(subset)
+        return tuple(c for c in self.columns if c in subset)
+
+    def _run(self, tasks):
+        initargs = (self.X.to_numpy(dtype=np.float64), self.y.to_numpy(), self.columns, self.folds,
+                    self.model, self.scoring)
+        if self.workers == 1 or len(tasks) == 1:
+            _init_worker(*initargs)
+            return [_score_fold(*task) for task in tasks]
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=initargs)
+        futures = [self._pool.submit(_score_fold, *task) for task in tasks]
+        return [future.result() for future in futures]
+
+    def score(self, subsets):
+        """Mean and std of the CV score of each subset, in input order."""
+        subsets = [self.canonical(s) for s in subsets]
+        keys = {}
+        tasks = []
+        for subset in subsets:
+            for fold in range(self.n_folds):
+                key = f"{','.join(subset)}|{fold}"
+                if key in self._cache or key in keys:
+                    self.stats["hits"] += 1
+                else:
+                    keys[key] = len(tasks)
+                    tasks.append((subset, fold))
+
+        if tasks:
+            for (subset, fold), value in zip(tasks, self._run(tasks)):
+                self._cache[f"{','.join(subset)}|{fold}"] = float(value)
+            self.stats["fits"] += len(tasks)
+            self._dirty = True
+
+        results = []
+        for subset in subsets:
+            fold_scores = [self._cache[f"{','.join(subset)}|{fold}"] for fold in range(self.n_folds)]
+            results.append((float(np.mean(fold_scores)), float(np.std(fold_scores))))
+        return results
+
+
+# Selection methods: each returns the selected feature names, best first
+
+def _top(scores, columns, k):
+    order = np.argsort(-np.asarray(scores), kind="stable")
+    return [columns[i] for i in order[:k]]
+
+
+def select_anova(X, y, k=8, **_):
+    return _top(np.nan_to_num(f_classif(X, y)[0]), list(X.columns), k)
+
+
+def select_mutual_info(X, y, k=8, **_):
+    discrete = [c in CATEGORICAL for c in X.columns]
+    scores = mutual_info_classif(X, y, discrete_features=discrete, random_state=RANDOM_STATE)
+    return _top(scores, list(X.columns), k)
+
+
+def select_rfe(X, y, k=8, workers=1, **_):
+    rfe = RFE(MODELS["rf"](workers), n_features_to_select=k).fit(X, y)
+    return _top(-rfe.ranking_, list(X.columns), k)
+
+
+def select_tree(X, y, k=8, workers=1, **_):
+    forest = MODELS["rf"](workers).fit(X, y)
+    return _top(forest.feature_importances_, list(X.columns), k)
+
+
+def select_l1(X, y, C=0.5, **_):
+    """Non-zero weights of an L1 LinearSVC, so the subset size follows from C rather than k."""
+    svc = LinearSVC(C=C, penalty="l1", dual=False, random_state=RANDOM_STATE)
+    svc.fit(StandardScaler().fit_transform(X), y)
+    mask = SelectFromModel(svc, prefit=True).get_support()
+    return _top(np.abs(svc.coef_).ravel()[mask], list(X.columns[mask]), int(mask.sum()))
+
+
+def select_permutation(X, y, k=8, workers=1, scoring="f1", **_):
+    """Permutation importance of a forest on a validation split of the training data."""
+    X_fit, X_val, y_fit, y_val = train_test_split(X, y, test_size=0.25, stratify=y, random_state=RANDOM_STATE)
+    forest = MODELS["rf"](workers).fit(X_fit, y_fit)
+    result = permutation_importance(forest, X_val, y_val, scoring=scoring, n_repeats=10,
+                                    random_state=RANDOM_STATE, n_jobs=workers)
+    return _top(result.importances_mean, list(X.columns), k)
+
+
+def select_forward(X, y, k=8, scorer=None, **_):
+    """
+    Greedy forward selection: add the feature that most improves the CV score.
+
+    Each step scores all candidates in one pooled batch. Because scores are
+    memoized, rerunning with a larger k only fits the new steps.
+    """
+    selected, remaining = [], list(X.columns)
+    while remaining and len(selected) < k:
+        candidates = [selected + [c] for c in remaining]
+        means = [mean for mean, _ in scorer.score(candidates)]
+        best = remaining[int(np.argmax(means))]
+        selected.append(best)
+        remaining.remove(best)
+    return selected
+
+
+SELECTORS = {
+    "anova": ("filter", select_anova),
+    "mutual_info": ("filter", select_mutual_info),
+    "rfe": ("wrapper", select_rfe),
+    "forward": ("wrapper", select_forward),
+    "tree": ("embedded", select_tree),
+    "l1": ("embedded", select_l1),
+    "permutation": ("embedded", select_permutation),
+}
+
+
+def _test_scores(X_train, X_test, y_train, y_test, features, model, metrics):
+    """Fit on the training split and score the held-out test split, as the notebook does."""
+    estimator = MODELS[model]().fit(X_train[features].to_numpy(), y_train.to_numpy())
+    return {metric: get_scorer(metric)(estimator, X_test[features].to_numpy(), y_test.to_numpy())
+            for metric in metrics}
+
+
+def run(methods=None, k=8, model="rf", folds=5, scoring="f1", workers=None, cache_path=CACHE_PATH,
+        data_path=DATA_PATH):
+    """
+    Run the selection methods on the training split and score each subset.
+
+    Subsets are CV-scored on the training split, which the forward search
+    has already maximised over, so each one is also refit on the whole
+    training split and scored on the 20% held-out test split. Returns a
+    DataFrame with one row per method plus the all-features baseline,
+    sorted by held-out test score.
+    """
+    X, y = load_data(data_path)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, stratify=y,
+                                                        random_state=RANDOM_STATE)
+    methods = methods or list(SELECTORS)
+    unknown = set(methods) - set(SELECTORS)
+    if unknown:
+        raise ValueError(f"❌ Unknown methods {sorted(unknown)}. Choose from {sorted(SELECTORS)}")
+
+    with SubsetScorer(X_train, y_train, model, folds, scoring, workers, cache_path) as scorer:
+        subsets = {"all_features": ("baseline", list(X.columns))}
+        for name in methods:
+            kind, select = SELECTORS[name]
+            start = time.perf_counter()
+            subsets[name] = (kind, select(X_train, y_train, k=k, workers=scorer.workers, scoring=scoring,
+                                          scorer=scorer))
+            print(f"✅ {name:<12} {len(subsets[name][1]):2d} features in {time.perf_counter() - start:.2f}s")
+
+        scores = scorer.score([features for _, features in subsets.values()])
+        print(f"📊 {scorer.stats['fits']} fold fits, {scorer.stats['hits']} served from cache")
+
+    metrics = list(dict.fromkeys([scoring, "accuracy", "precision", "recall", "roc_auc"]))
+    rows = []
+    for (name, (kind, features)), (mean, std) in zip(subsets.items(), scores):
+        test = _test_scores(X_train, X_test, y_train, y_test, features, model, metrics)
+        rows.append({"Method": name, "Type": kind, **{f"Test {m}": test[m] for m in metrics},
+                     f"CV {scoring}": mean, "CV Std": std, "Feature Count": len(features),
+                     "Features": ", ".join(features)})
+    return pd.DataFrame(rows).sort_values(f"Test {scoring}", ascending=False).reset_index(drop=True)
+
+
+def benchmark(k=8, model="rf", folds=5, workers=None):
+    """Forward search sequentially without a cache, then pooled (cold cache), then rerun (warm cache)."""
+    X, y = load_data()
+    timings, selected = {}, {}
+    for label, n_workers, cache in (("sequential, no cache", 1, False),
+                                    ("pooled, cold cache", workers, True),
+                                    ("pooled, warm cache", workers, True)):
+        cache_path = CACHE_PATH.with_suffix(".bench.json") if cache else None
+        if label.endswith("cold cache") and cache_path.exists():
+            cache_path.unlink()
+        start = time.perf_counter()
+        with SubsetScorer(X, y, model, folds, workers=n_workers, cache_path=cache_path) as scorer:
+            selected[label] = select_forward(X, y, k=k, scorer=scorer)
+        timings[label] = time.perf_counter() - start
+        print(f"{label:<22} {timings[label]:7.2f}s  fits={scorer.stats['fits']:4d} hits={scorer.stats['hits']:4d}")
+    CACHE_PATH.with_suffix(".bench.json").unlink()
+
+    if len({tuple(s) for s in selected.values()}) != 1:
+        raise AssertionError(f"❌ Forward selection differs between runs: {selected}")
+    print(f"✅ Same {k} features every run: {selected['pooled, warm cache']}")
+    return timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Feature selection on the Heart Disease UCI dataset.")
+    parser.add_argument("--methods", type=str, nargs="+", default=None, choices=sorted(SELECTORS),
+                        help="Methods to run (default: all)")
+    parser.add_argument("--k", type=int, default=8, help="Features to keep for ranking methods")
+    parser.add_argument("--model", type=str, default="rf", choices=sorted(MODELS))
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--scoring", type=str, default="f1")
+    parser.add_argument("--workers", type=int, default=None, help="Scoring processes (default: CPUs usable under the affinity mask / CPU quota)")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the score cache")
+    parser.add_argument("--out", type=str, default=None, help="Write the summary table to this CSV")
+    parser.add_argument("--bench", action="store_true", help="Time forward search with and without the pool/cache")
+    args = parser.parse_args()
+
+    if args.bench:
+        benchmark(args.k, args.model, args.folds, args.workers)
+    else:
+        summary = run(args.methods, args.k, args.model, args.folds, args.scoring, args.workers,
+                      None if args.no_cache else CACHE_PATH)
+        print(summary.to_string(index=False, float_format="{:.3f}".format))
+        if args.out:
+            summary.to_csv(args.out, index=False)
+            print(f"💾 Summary saved to {args.out}")
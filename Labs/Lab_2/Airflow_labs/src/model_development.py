@@ -14,8 +14,14 @@ matplotlib.use("Agg")  # ✅ prevents macOS GUI crash inside Airflow workers
 import matplotlib.pyplot as plt
 import joblib
 import os
+import sys
 
-from .utils.paths import DATA_FILE, REPORTS_DIR, MODEL_FILE
+from .utils.paths import DATA_FILE, REPORTS_DIR, MODEL_FILE, MODEL_NPZ_FILE
+
+# Shared helpers live in Labs/common
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+from common.linear_runtime import export_linear
+from common.profiling import profile_run, stage
 
 
 # ============================================================
@@ -72,100 +78,114 @@ def _prep_features(df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.Series, List[str]
 
 
 def train_and_evaluate(random_state: int = 42, test_size: float = 0.2) -> TrainResult:
-    """Train Linear Regression, generate metrics + visualizations."""
-    df = pd.read_csv(DATA_FILE)
-    X, y, feature_names = _prep_features(df)
-
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=test_size, random_state=random_state
-    )
-
-    model = LinearRegression()
-    model.fit(X_train, y_train)
-    y_pred = model.predict(X_test)
-
-    r2 = r2_score(y_test, y_pred)
-    mse = mean_squared_error(y_test, y_pred)
-    rmse = float(np.sqrt(mse))
-
-    # save model
-    os.makedirs(os.path.dirname(MODEL_FILE), exist_ok=True)
-    joblib.dump(model, MODEL_FILE)
-
-    # create unique report directory
+    """Train Linear Regression, generate metrics + visualizations (stage profile saved with the report)."""
+    # create unique report directory; the stage profile is written next to the report
     run_id = pd.Timestamp.utcnow().strftime("%Y%m%dT%H%M%SZ")
     report_dir = REPORTS_DIR / run_id
-    report_dir.mkdir(parents=True, exist_ok=True)
-
-    # ---------- Visualizations ----------
-
-    # (1) Coefficients
-    coef = model.coef_
-    plt.figure(figsize=(6, 4))
-    order = np.argsort(np.abs(coef))[::-1]
-    plt.bar([feature_names[i] for i in order], coef[order])
-    plt.xticks(rotation=45, ha="right")
-    plt.title("Linear Regression Coefficients")
-    plt.tight_layout()
-    coef_png = report_dir / "coefficients.png"
-    plt.savefig(coef_png, dpi=150)
-    plt.close()
-
-    # (2) Actual vs Predicted
-    plt.figure(figsize=(6, 4))
-    plt.scatter(y_test, y_pred, s=10, alpha=0.7)
-    lims = [min(y_test.min(), y_pred.min()), max(y_test.max(), y_pred.max())]
-    plt.plot(lims, lims, "r--")
-    plt.xlabel("Actual")
-    plt.ylabel("Predicted")
-    plt.title("Actual vs Predicted")
-    plt.tight_layout()
-    avp_png = report_dir / "actual_vs_pred.png"
-    plt.savefig(avp_png, dpi=150)
-    plt.close()
-
-    # (3) Residuals
-    residuals = y_test - y_pred
-    plt.figure(figsize=(6, 4))
-    plt.hist(residuals, bins=30, edgecolor="black")
-    plt.title("Residuals Distribution")
-    plt.xlabel("Residual")
-    plt.ylabel("Count")
-    plt.tight_layout()
-    resid_png = report_dir / "residuals.png"
-    plt.savefig(resid_png, dpi=150)
-    plt.close()
-
-    # ---------- Metrics & HTML ----------
-
-    metrics = {"r2": float(r2), "rmse": rmse, "mse": float(mse)}
-    metrics_json = report_dir / "metrics.json"
-    with open(metrics_json, "w") as f:
-        json.dump(metrics, f, indent=2)
-
-    html = f"""
-    <html>
-    <body>
-      <h2>Model Training Report</h2>
-      <p><b>Run ID:</b> {run_id}</p>
-      <h3>Metrics</h3>
-      <ul>
-        <li>R²: {r2:.4f}</li>
-        <li>RMSE: {rmse:.4f}</li>
-      </ul>
-      <h3>Visualizations</h3>
-      <p><img src="{{{{cid:coefficients.png}}}}" width="600"/></p>
-      <p><img src="{{{{cid:actual_vs_pred.png}}}}" width="600"/></p>
-      <p><img src="{{{{cid:residuals.png}}}}" width="600"/></p>
-    </body>
-    </html>
-    """
-    report_html = report_dir / "report.html"
-    report_html.write_text(html)
-
-    # Also export dataset head for email attachment
-    head_csv = report_dir / "data_head.csv"
-    df.head(20).to_csv(head_csv, index=False)
+    with profile_run("airflow_sales_linear_regression", out_dir=report_dir):
+        return _train_and_evaluate(random_state, test_size, run_id, report_dir)
+
+
+def _train_and_evaluate(random_state: int, test_size: float, run_id: str, report_dir: Path) -> TrainResult:
+    with stage("load"):
+        df = pd.read_csv(DATA_FILE)
+
+    with stage("preprocess"):
+        X, y, feature_names = _prep_features(df)
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=test_size, random_state=random_state
+        )
+
+    with stage("fit"):
+        model = LinearRegression()
+        model.fit(X_train, y_train)
+
+    with stage("evaluate"):
+        y_pred = model.predict(X_test)
+        r2 = r2_score(y_test, y_pred)
+        mse = mean_squared_error(y_test, y_pred)
+        rmse = float(np.sqrt(mse))
+
+    # save model, plus a compact .npz (coefficients + one-hot schema) for sklearn-free scoring
+    with stage("save"):
+        os.makedirs(os.path.dirname(MODEL_FILE), exist_ok=True)
+        joblib.dump(model, MODEL_FILE)
+        channels = [name[len("channel_"):] for name in feature_names if name.startswith("channel_")]
+        export_linear(model, MODEL_NPZ_FILE, feature_names, one_hot={"channel": channels})
+
+    # ---------- Report: plots, metrics.json, HTML ----------
+    with stage("report"):
+        report_dir.mkdir(parents=True, exist_ok=True)
+
+        # ---------- Visualizations ----------
+
+        # (1) Coefficients
+        coef = model.coef_
+        plt.figure(figsize=(6, 4))
+        order = np.argsort(np.abs(coef))[::-1]
+        plt.bar([feature_names[i] for i in order], coef[order])
+        plt.xticks(rotation=45, ha="right")
+        plt.title("Linear Regression Coefficients")
+        plt.tight_layout()
+        coef_png = report_dir / "coefficients.png"
+        plt.savefig(coef_png, dpi=150)
+        plt.close()
+
+        # (2) Actual vs Predicted
+        plt.figure(figsize=(6, 4))
+        plt.scatter(y_test, y_pred, s=10, alpha=0.7)
+        lims = [min(y_test.min(), y_pred.min()), max(y_test.max(), y_pred.max())]
+        plt.plot(lims, lims, "r--")
+        plt.xlabel("Actual")
+        plt.ylabel("Predicted")
+        plt.title("Actual vs Predicted")
+        plt.tight_layout()
+        avp_png = report_dir / "actual_vs_pred.png"
+        plt.savefig(avp_png, dpi=150)
+        plt.close()
+
+        # (3) Residuals
+        residuals = y_test - y_pred
+        plt.figure(figsize=(6, 4))
+        plt.hist(residuals, bins=30, edgecolor="black")
+        plt.title("Residuals Distribution")
+        plt.xlabel("Residual")
+        plt.ylabel("Count")
+        plt.tight_layout()
+        resid_png = report_dir / "residuals.png"
+        plt.savefig(resid_png, dpi=150)
+        plt.close()
+
+        # ---------- Metrics & HTML ----------
+
+        metrics = {"r2": float(r2), "rmse": rmse, "mse": float(mse)}
+        metrics_json = report_dir / "metrics.json"
+        with open(metrics_json, "w") as f:
+            json.dump(metrics, f, indent=2)
+
+        html = f"""
+        <html>
+        <body>
+          <h2>Model Training Report</h2>
+          <p><b>Run ID:</b> {run_id}</p>
+          <h3>Metrics</h3>
+          <ul>
+            <li>R²: {r2:.4f}</li>
+            <li>RMSE: {rmse:.4f}</li>
+          </ul>
+          <h3>Visualizations</h3>
+          <p><img src="{{{{cid:coefficients.png}}}}" width="600"/></p>
+          <p><img src="{{{{cid:actual_vs_pred.png}}}}" width="600"/></p>
+          <p><img src="{{{{cid:residuals.png}}}}" width="600"/></p>
+        </body>
+        </html>
+        """
+        report_html = report_dir / "report.html"
+        report_html.write_text(html)
+
+        # Also export dataset head for email attachment
+        head_csv = report_dir / "data_head.csv"
+        df.head(20).to_csv(head_csv, index=False)
 
     print(f"✅ Training complete. Report saved under {report_dir}")
     return TrainResult(metrics=metrics, coef=coef, feature_names=feature_names, report_dir=report_dir)
@@ -17,3 +17,5 @@ for d in (DATA_DIR, MODELS_DIR, REPORTS_DIR):
 
 DATA_FILE = DATA_DIR / "sales_1000x10.csv"
 MODEL_FILE = MODELS_DIR / "linear_regression.pkl"
+# Same model for the NumPy-only scorer in Labs/common/linear_runtime.py
+MODEL_NPZ_FILE = MODELS_DIR / "linear_regression.npz"
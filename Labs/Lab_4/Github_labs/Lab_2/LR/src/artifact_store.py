@@ -0,0 +1,308 @@
+import os
+import copy
+import json
+import pickle
+import hashlib
+import argparse
+import datetime
+import numpy as np
+from joblib import dump, load
+
+STORE_DIR = "models"
+OBJECTS_DIRNAME = "objects"
+MANIFEST_FILENAME = "manifest.json"
+
+# Attributes that change between processes without changing behaviour
+# (e.g. TfidfVectorizer keeps id() of its stop word list). They are left out
+# of the content hash so identical artifacts deduplicate across runs.
+VOLATILE_ATTRS = ("_stop_words_id",)
+
+
+def _canonical(obj):
+    """Return a shallow copy of obj without process-specific attributes."""
+    state = getattr(obj, "__dict__", None)
+    if not state or not any(attr in state for attr in VOLATILE_ATTRS):
+        return obj
+    obj = copy.copy(obj)
+    for attr in VOLATILE_ATTRS:
+        obj.__dict__.pop(attr, None)
+    return obj
+
+
+def _downcast(model):
+    """Return a copy of a linear model with float32 coefficient arrays."""
+    if not hasattr(model, "coef_"):
+        return model
+    model = copy.copy(model)
+    model.coef_ = np.asarray(model.coef_, dtype=np.float32)
+    if isinstance(getattr(model, "intercept_", None), np.ndarray):
+        model.intercept_ = model.intercept_.astype(np.float32)
+    return model
+
+
+def fingerprint(obj):
+    """SHA-256 of the canonical pickle of obj, plus the pickle size in bytes."""
+    payload = pickle.dumps(_canonical(obj), protocol=4)
+    return hashlib.sha256(payload).hexdigest(), len(payload)
+
+
+class ArtifactStore:
+    """
+    Content-addressed store for the IMDB LR pipeline artifacts.
+
+    Every model and vectorizer is saved once under models/objects/<sha256>.joblib
+    (zlib-compressed), and models/manifest.json maps run timestamps to the
+    digests they use, so nightly runs that produce an identical vectorizer or
+    model add no new files.
+    """
+
+    def __init__(self, root=STORE_DIR, compress=3, downcast=True):
+        self.root = root
+        self.objects_dir = os.path.join(root, OBJECTS_DIRNAME)
+        self.manifest_path = os.path.join(root, MANIFEST_FILENAME)
+        self.compress = compress
+        self.downcast = downcast
+        self._manifest = None
+        self._manifest_mtime = None
+
+    # ------------------------------------------------------------------
+    # Manifest
+    # ------------------------------------------------------------------
+    def _mtime(self):
+        try:
+            return os.stat(self.manifest_path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    @property
+    def manifest(self):
+        if self._manifest is None:
+            self._manifest_mtime = self._mtime()
+            if self._manifest_mtime is not None:
+                with open(self.manifest_path) as f:
+                    self._manifest = json.load(f)
+            else:
+                self._manifest = {"objects": {}, "runs": {}}
+        return self._manifest
+
+    def refresh(self):
+        """Drop the cached manifest if another process rewrote it since it was read."""
+        if self._manifest is not None and self._mtime() != self._manifest_mtime:
+            self._manifest = None
+
+    def _write_manifest(self):
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+        self._manifest_mtime = self._mtime()
+
+    def runs(self):
+        return self.manifest["runs"]
+
+    def latest(self):
+        """Timestamp of the most recent run, or None if the store is empty."""
+        runs = self.runs()
+        return max(runs) if runs else None
+
+    # ------------------------------------------------------------------
+    # Objects
+    # ------------------------------------------------------------------
+    def object_path(self, digest):
+        return os.path.join(self.objects_dir, f"{digest}.joblib")
+
+    def object_size(self, digest):
+        """Uncompressed pickle size of a stored object in bytes."""
+        return self.manifest["objects"][digest]["size"]
+
+    def put(self, obj, kind):
+        """Store obj if its content is new and return its digest."""
+        obj = _canonical(obj)
+        digest, size = fingerprint(obj)
+        objects = self.manifest["objects"]
+        if digest not in objects or not os.path.exists(self.object_path(digest)):
+            os.makedirs(self.objects_dir, exist_ok=True)
+            tmp_path = self.object_path(digest) + ".tmp"
+            dump(obj, tmp_path, compress=self.compress)
+            os.replace(tmp_path, self.object_path(digest))
+            objects[digest] = {"kind": kind, "size": size}
+        return digest
+
+    def get(self, digest):
+        return load(self.object_path(digest))
+
+    # ------------------------------------------------------------------
+    # Runs
+    # ------------------------------------------------------------------
+    def save_run(self, timestamp, model, vectorizer, metrics=None):
+        """Store a trained model/vectorizer pair under a run timestamp."""
+        if self.downcast:
+            model = _downcast(model)
+        entry = self.runs().get(timestamp, {})
+        entry.update({
+            "model": self.put(model, "model"),
+            "vectorizer": self.put(vectorizer, "vectorizer"),
+            "created_at": entry.get("created_at", datetime.datetime.now().isoformat(timespec="seconds")),
+        })
+        if metrics:
+            entry.setdefault("metrics", {}).update(metrics)
+        self.runs()[timestamp] = entry
+        self._write_manifest()
+        return entry
+
+    def record_metrics(self, timestamp, metrics):
+        """Attach evaluation metrics to a run so retention can rank it."""
+        if timestamp not in self.runs():
+            return
+        self.runs()[timestamp].setdefault("metrics", {}).update(
+            {k: float(v) for k, v in metrics.items()}
+        )
+        self._write_manifest()
+
+    def run_digests(self, timestamp):
+        """Return (model_digest, vectorizer_digest) for a stored run."""
+        entry = self.runs()[timestamp]
+        return entry["model"], entry["vectorizer"]
+
+    def load_run(self, timestamp):
+        """
+        Load (model, vectorizer) for a run timestamp.
+
+        Falls back to the pre-store layout models/model_<ts>_lr.joblib so runs
+        that were never imported keep working.
+        """
+        if timestamp in self.runs():
+            model_digest, vectorizer_digest = self.run_digests(timestamp)
+            return self.get(model_digest), self.get(vectorizer_digest)
+
+        model_path, vectorizer_path = legacy_paths(timestamp, self.root)
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"❌ Model file not found at {model_path}")
+        if not os.path.exists(vectorizer_path):
+            raise FileNotFoundError(f"❌ Vectorizer not found at {vectorizer_path}")
+        return load(model_path), load(vectorizer_path)
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+    def import_legacy(self, metrics_dir="metrics", remove=False):
+        """Move models/model_<ts>_lr.joblib + vectorizer_<ts>.joblib pairs into the store."""
+        imported = []
+        for timestamp in legacy_timestamps(self.root):
+            model_path, vectorizer_path = legacy_paths(timestamp, self.root)
+            if timestamp in self.runs() or not os.path.exists(vectorizer_path):
+                continue
+            metrics_path = os.path.join(metrics_dir, f"{timestamp}_metrics.json")
+            metrics = None
+            if os.path.exists(metrics_path):
+                with open(metrics_path) as f:
+                    metrics = json.load(f)
+            self.save_run(timestamp, load(model_path), load(vectorizer_path), metrics)
+            imported.append(timestamp)
+            if remove:
+                os.remove(model_path)
+                os.remove(vectorizer_path)
+        return imported
+
+    def prune(self, keep_best=5, keep_latest=10, metric="f1_score"):
+        """
+        Retention policy: keep the keep_best runs ranked by metric plus the
+        keep_latest most recent runs, drop the rest and garbage-collect objects
+        no remaining run refers to. Returns the removed run timestamps.
+        """
+        runs = self.runs()
+        latest = sorted(runs, reverse=True)[:keep_latest]
+        ranked = sorted(
+            (ts for ts in runs if metric in runs[ts].get("metrics", {})),
+            key=lambda ts: (runs[ts]["metrics"][metric], ts),
+            reverse=True,
+        )
+        keep = set(latest) | set(ranked[:keep_best])
+        removed = sorted(ts for ts in runs if ts not in keep)
+        for ts in removed:
+            del runs[ts]
+        self.gc()
+        self._write_manifest()
+        return removed
+
+    def gc(self):
+        """Delete stored objects that are no longer referenced by any run."""
+        referenced = set()
+        for entry in self.runs().values():
+            referenced.update((entry["model"], entry["vectorizer"]))
+        removed = [d for d in self.manifest["objects"] if d not in referenced]
+        for digest in removed:
+            del self.manifest["objects"][digest]
+            if os.path.exists(self.object_path(digest)):
+                os.remove(self.object_path(digest))
+        return removed
+
+    def disk_usage(self):
+        return sum(
+            os.path.getsize(self.object_path(d))
+            for d in self.manifest["objects"]
+            if os.path.exists(self.object_path(d))
+        )
+
+
+def legacy_paths(timestamp, root=STORE_DIR):
+    return (
+        os.path.join(root, f"model_{timestamp}_lr.joblib"),
+        os.path.join(root, f"vectorizer_{timestamp}.joblib"),
+    )
+
+
+def legacy_timestamps(root=STORE_DIR):
+    """Timestamps of the pre-store models/model_<ts>_lr.joblib files."""
+    if not os.path.isdir(root):
+        return []
+    return sorted(
+        name[len("model_"):-len("_lr.joblib")]
+        for name in os.listdir(root)
+        if name.startswith("model_") and name.endswith("_lr.joblib")
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the IMDB model artifact store.")
+    parser.add_argument("--root", type=str, default=STORE_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    imp = sub.add_parser("import", help="Import legacy timestamped joblib files")
+    imp.add_argument("--remove", action="store_true", help="Delete legacy files after import")
+
+    prune = sub.add_parser("prune", help="Apply the retention policy")
+    prune.add_argument("--keep-best", type=int, default=5)
+    prune.add_argument("--keep-latest", type=int, default=10)
+    prune.add_argument("--metric", type=str, default="f1_score")
+
+    sub.add_parser("stats", help="Show store statistics")
+
+    export = sub.add_parser("export", help="Export a run to .npz for the NumPy-only scorer")
+    export.add_argument("--timestamp", type=str, default=None, help="Run to export (default: latest)")
+    export.add_argument("--out", type=str, default=None, help="Default: models/<timestamp>_linear.npz")
+    args = parser.parse_args()
+
+    store = ArtifactStore(args.root)
+    if args.command == "import":
+        imported = store.import_legacy(remove=args.remove)
+        print(f"📦 Imported {len(imported)} runs into {store.objects_dir}")
+    elif args.command == "prune":
+        removed = store.prune(args.keep_best, args.keep_latest, args.metric)
+        print(f"🧹 Pruned {len(removed)} runs, {len(store.runs())} kept")
+    elif args.command == "export":
+        import sys
+        # Shared helpers live in Labs/common
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "..", ".."))
+        from common.linear_runtime import export_linear
+
+        timestamp = args.timestamp or store.latest()
+        out = args.out or os.path.join(store.root, f"{timestamp}_linear.npz")
+        model, vectorizer = store.load_run(timestamp)
+        export_linear(model, out, vectorizer=vectorizer)
+        print(f"💾 Exported run {timestamp} to {out} ({os.path.getsize(out) / 1024:.1f} KiB)")
+    print(
+        f"📊 {len(store.runs())} runs -> {len(store.manifest['objects'])} unique objects, "
+        f"{store.disk_usage() / 1024:.1f} KiB on disk"
+    )
@@ -0,0 +1,143 @@
+import os
+import sys
+import json
+import time
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from artifact_store import ArtifactStore, legacy_timestamps
+
+# Shared helpers live in Labs/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "..", ".."))
+from common.cpus import available_cpus
+
+# Set once per worker process by _init_worker
+_MODEL = None
+_VECTORIZER = None
+
+
+def _init_worker(timestamp, store_root):
+    """Load the model/vectorizer pair once per worker instead of once per chunk."""
+    global _MODEL, _VECTORIZER
+    _MODEL, _VECTORIZER = ArtifactStore(store_root).load_run(timestamp)
+
+
+def _score_chunk(texts):
+    """Vectorize and score one chunk of reviews in the current process."""
+    X_vec = _VECTORIZER.transform(texts)
+    proba = _MODEL.predict_proba(X_vec)
+    labels = _MODEL.classes_[proba.argmax(axis=1)]
+    positive = list(_MODEL.classes_).index(1) if 1 in _MODEL.classes_ else proba.shape[1] - 1
+    return [int(label) for label in labels], [float(p) for p in proba[:, positive]]
+
+
+def read_chunks(path, text_field="text", id_field="id", chunk_size=1000):
+    """
+    Stream (ids, texts) chunks from a JSONL or Parquet file.
+
+    Only one chunk is held in memory at a time; rows without an id get their
+    0-based position in the file.
+    """
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(path)
+        columns = [text_field] + ([id_field] if id_field in parquet_file.schema_arrow.names else [])
+        offset = 0
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+            texts = batch.column(text_field).to_pylist()
+            if id_field in columns:
+                ids = batch.column(id_field).to_pylist()
+            else:
+                ids = list(range(offset, offset + len(texts)))
+            offset += len(texts)
+            yield ids, texts
+        return
+
+    ids, texts = [], []
+    with open(path) as f:
+        for row_number, line in enumerate(f):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            ids.append(record.get(id_field, row_number))
+            texts.append(record[text_field])
+            if len(texts) == chunk_size:
+                yield ids, texts
+                ids, texts = [], []
+    if texts:
+        yield ids, texts
+
+
+def _write_chunk(out, ids, labels, probabilities):
+    for row_id, label, probability in zip(ids, labels, probabilities):
+        out.write(json.dumps({"id": row_id, "predicted_label": label, "probability": round(probability, 6)}) + "\n")
+
+
+def batch_predict(input_path, output_path, timestamp=None, workers=None, chunk_size=1000,
+                  text_field="text", id_field="id", store_root="models"):
+    """
+    Score every review in input_path and write predictions to output_path as JSONL.
+
+    output_path is overwritten. Without a timestamp the latest run is used,
+    whether it is in the store manifest or only a legacy model_<ts>_lr.joblib.
+
+    At most 2 * workers chunks are in flight, so memory stays bounded no
+    matter how large the input is; results are written in input order.
+    Returns (rows scored, reviews per second).
+    """
+    if timestamp is None:
+        runs = legacy_timestamps(store_root) + [ArtifactStore(store_root).latest()]
+        timestamp = max((ts for ts in runs if ts), default=None)
+    if timestamp is None:
+        raise FileNotFoundError("❌ No stored runs found. Train a model first.")
+    workers = workers or available_cpus()
+
+    rows = 0
+    start = time.perf_counter()
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    chunks = read_chunks(input_path, text_field, id_field, chunk_size)
+
+    with open(output_path, "w") as out:
+        if workers == 1:
+            _init_worker(timestamp, store_root)
+            for ids, texts in chunks:
+                _write_chunk(out, ids, *_score_chunk(texts))
+                rows += len(ids)
+        else:
+            with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                     initargs=(timestamp, store_root)) as pool:
+                pending = deque()
+                for ids, texts in chunks:
+                    pending.append((ids, pool.submit(_score_chunk, texts)))
+                    if len(pending) >= 2 * workers:
+                        done_ids, future = pending.popleft()
+                        _write_chunk(out, done_ids, *future.result())
+                        rows += len(done_ids)
+                while pending:
+                    done_ids, future = pending.popleft()
+                    _write_chunk(out, done_ids, *future.result())
+                    rows += len(done_ids)
+
+    elapsed = time.perf_counter() - start
+    throughput = rows / elapsed if elapsed > 0 else 0.0
+    print(f"✅ Scored {rows} reviews with run {timestamp} in {elapsed:.2f}s "
+          f"({throughput:,.0f} reviews/s, {workers} workers)")
+    print(f"💾 Predictions saved to {output_path}")
+    return rows, throughput
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batch-score IMDB reviews from JSONL or Parquet.")
+    parser.add_argument("input", type=str, help="Input .jsonl or .parquet file")
+    parser.add_argument("output", type=str, help="Output .jsonl file")
+    parser.add_argument("--timestamp", type=str, default=None, help="Run to use (default: latest)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Scoring processes (default: CPUs usable under the affinity mask / CPU quota)")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--text-field", type=str, default="text")
+    parser.add_argument("--id-field", type=str, default="id")
+    args = parser.parse_args()
+
+    batch_predict(args.input, args.output, args.timestamp, args.workers,
+                  args.chunk_size, args.text_field, args.id_field)
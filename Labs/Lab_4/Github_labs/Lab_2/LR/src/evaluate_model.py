@@ -2,28 +2,35 @@ import os
 import json
 import argparse
 from datasets import load_dataset
-from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics import accuracy_score, f1_score
-from joblib import load
-
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--timestamp", type=str, required=True)
-    args = parser.parse_args()
-    timestamp = args.timestamp
-
-    print("📥 Loading IMDB test dataset...")
-    dataset = load_dataset("imdb", split="test[:500]")
-    X = dataset["text"]
-    y = dataset["label"]
-
-    print("🔠 Vectorizing text using TF-IDF...")
-    vectorizer = TfidfVectorizer(max_features=2000)
-    X_vec = vectorizer.fit_transform(X)
-
-    model_path = f"models/model_{timestamp}_lr.joblib"
-    model = load(model_path)
-    print(f"✅ Loaded model from {model_path}")
+from artifact_store import ArtifactStore
+from run_index import RunIndex
+
+
+def evaluate(timestamp, model=None, vectorizer=None, test_split=None):
+    """
+    Score a trained run on the first 500 IMDB test reviews and save its metrics.
+
+    Args:
+        timestamp (str): Run identifier.
+        model, vectorizer: In-memory estimators; loaded from the store when omitted.
+        test_split (Dataset): Preloaded evaluation split; downloaded when omitted.
+    Returns:
+        dict: Accuracy and F1 score.
+    """
+    store = ArtifactStore()
+    if model is None or vectorizer is None:
+        model, vectorizer = store.load_run(timestamp)
+        print(f"✅ Loaded model for run {timestamp}")
+
+    if test_split is None:
+        print("📥 Loading IMDB test dataset...")
+        test_split = load_dataset("imdb", split="test[:500]")
+    X = test_split["text"]
+    y = test_split["label"]
+
+    print("🔠 Vectorizing text using the trained TF-IDF vectorizer...")
+    X_vec = vectorizer.transform(X)
 
     y_pred = model.predict(X_vec)
 
@@ -36,5 +43,16 @@ if __name__ == "__main__":
         os.makedirs("metrics/")
     with open(f"metrics/{timestamp}_metrics.json", "w") as f:
         json.dump(metrics, f, indent=4)
+    store.record_metrics(timestamp, metrics)
+    with RunIndex() as index:
+        index.record(timestamp, metrics)
 
     print("📈 Evaluation complete. Metrics saved to metrics folder.")
+    return metrics
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--timestamp", type=str, required=True)
+    args = parser.parse_args()
+    evaluate(args.timestamp)
@@ -0,0 +1,293 @@
+import os
+import json
+import time
+import argparse
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from joblib import load
+from artifact_store import ArtifactStore, fingerprint, legacy_paths, legacy_timestamps
+
+
+class ModelCache:
+    """
+    LRU cache of loaded models and vectorizers, bounded by bytes.
+
+    Entries are keyed by content digest, so a vectorizer shared by many runs
+    (the common case: the TF-IDF settings rarely change) is loaded and held
+    once. Sizes are the uncompressed pickle sizes recorded in the store
+    manifest, a close proxy for the in-memory footprint.
+    """
+
+    def __init__(self, store, max_bytes=512 * 1024 * 1024):
+        self.store = store
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._entries = OrderedDict()  # digest -> (obj, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._loading = {}  # digest -> Lock, so concurrent misses load once
+        # Legacy runs are not in the manifest: timestamp -> (model_digest, vectorizer_digest)
+        self._legacy_digests = {}
+
+    @property
+    def nbytes(self):
+        return self._bytes
+
+    def cached(self):
+        with self._lock:
+            return list(self._entries)
+
+    def _lookup(self, digest):
+        with self._lock:
+            if digest in self._entries:
+                self._entries.move_to_end(digest)
+                self.stats["hits"] += 1
+                return self._entries[digest][0]
+        return None
+
+    def _insert(self, digest, obj, size):
+        with self._lock:
+            if digest in self._entries:
+                return
+            self._entries[digest] = (obj, size)
+            self._bytes += size
+            # Evict least recently used entries, but never the one just loaded
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.stats["evictions"] += 1
+
+    def _get(self, digest, loader):
+        obj = self._lookup(digest)
+        if obj is not None:
+            return obj
+        with self._lock:
+            loading = self._loading.setdefault(digest, threading.Lock())
+        with loading:
+            # Another thread may have loaded it while we waited
+            obj = self._lookup(digest)
+            if obj is None:
+                obj, size = loader()
+                with self._lock:
+                    self.stats["misses"] += 1
+                self._insert(digest, obj, size)
+        return obj
+
+    def digests(self, timestamp):
+        """(model_digest, vectorizer_digest) of a run, stored or legacy."""
+        if timestamp in self.store.runs():
+            return self.store.run_digests(timestamp)
+        if timestamp not in self._legacy_digests:
+            self._load_legacy(timestamp)
+        return self._legacy_digests[timestamp]
+
+    def _load_legacy(self, timestamp):
+        """Read a legacy pair to learn its digests; returns {digest: (obj, size)} for the caller to cache."""
+        model_path, vectorizer_path = legacy_paths(timestamp, self.store.root)
+        if not os.path.exists(model_path) or not os.path.exists(vectorizer_path):
+            raise FileNotFoundError(f"❌ Unknown run {timestamp}")
+        loaded, digests = {}, []
+        for path in (model_path, vectorizer_path):
+            obj = load(path)
+            digest, size = fingerprint(obj)
+            loaded[digest] = (obj, size)
+            digests.append(digest)
+        self._legacy_digests[timestamp] = tuple(digests)
+        return loaded
+
+    def get_pair(self, timestamp):
+        """(model, vectorizer) of a run, loading whatever is not cached."""
+        loaded = {}
+        if timestamp not in self.store.runs() and timestamp not in self._legacy_digests:
+            loaded = self._load_legacy(timestamp)
+        model_digest, vectorizer_digest = self.digests(timestamp)
+        # A legacy pair that was just read goes through _get too, so it counts as a miss
+        vectorizer = self._get(vectorizer_digest,
+                               lambda: loaded.get(vectorizer_digest) or self._load(vectorizer_digest, timestamp, 1))
+        model = self._get(model_digest, lambda: loaded.get(model_digest) or self._load(model_digest, timestamp, 0))
+        return model, vectorizer
+
+    def _load(self, digest, timestamp, position):
+        if digest in self.store.manifest["objects"]:
+            return self.store.get(digest), self.store.object_size(digest)
+        # Evicted legacy object: reload it from its timestamped file
+        obj = load(legacy_paths(timestamp, self.store.root)[position])
+        return obj, fingerprint(obj)[1]
+
+
+def _positive_column(model):
+    classes = list(model.classes_)
+    return classes.index(1) if 1 in classes else len(classes) - 1
+
+
+class ModelServer:
+    """Score review batches against any stored run, or fan one batch out to several runs."""
+
+    def __init__(self, store_root="models", max_bytes=512 * 1024 * 1024, workers=4):
+        self.store = ArtifactStore(store_root)
+        self.cache = ModelCache(self.store, max_bytes)
+        self.pool = ThreadPoolExecutor(workers)
+
+    def versions(self):
+        self.store.refresh()
+        return sorted(set(self.store.runs()) | set(legacy_timestamps(self.store.root)))
+
+    def resolve(self, version):
+        # Nightly runs rewrite the manifest; pick up new runs without a restart
+        self.store.refresh()
+        if version in (None, "latest"):
+            version = max(self.versions(), default=None)
+            if version is None:
+                raise FileNotFoundError("❌ No stored runs found. Train a model first.")
+        return version
+
+    def predict(self, texts, version=None):
+        version = self.resolve(version)
+        model, vectorizer = self.cache.get_pair(version)
+        return self._score(model, vectorizer.transform(texts), version)
+
+    def compare(self, texts, versions):
+        """
+        Score one batch against several runs for A/B comparison.
+
+        Pairs are loaded in parallel, each distinct vectorizer transforms the
+        batch once, and the models are scored in parallel on the shared matrix.
+        Also returns, for every run, the fraction of labels that agree with
+        the first run.
+        """
+        versions = [self.resolve(v) for v in versions]
+        pairs = dict(zip(versions, self.pool.map(self.cache.get_pair, versions)))
+
+        by_vectorizer = {}
+        for version in versions:
+            by_vectorizer.setdefault(self.cache.digests(version)[1], version)
+        matrices = dict(zip(by_vectorizer, self.pool.map(
+            lambda v: pairs[v][1].transform(texts), by_vectorizer.values())))
+
+        results = dict(zip(versions, self.pool.map(
+            lambda v: self._score(pairs[v][0], matrices[self.cache.digests(v)[1]], v), versions)))
+
+        baseline = results[versions[0]]["labels"]
+        for version in versions:
+            labels = results[version]["labels"]
+            agree = sum(a == b for a, b in zip(labels, baseline))
+            results[version]["agreement_with_first"] = agree / len(labels) if labels else 1.0
+        return results
+
+    @staticmethod
+    def _score(model, X_vec, version):
+        proba = model.predict_proba(X_vec)
+        labels = model.classes_[proba.argmax(axis=1)]
+        return {
+            "version": version,
+            "labels": [int(label) for label in labels],
+            "probabilities": [round(float(p), 6) for p in proba[:, _positive_column(model)]],
+        }
+
+    def cache_info(self):
+        return {
+            "entries": len(self.cache.cached()),
+            "bytes": self.cache.nbytes,
+            "max_bytes": self.cache.max_bytes,
+            **self.cache.stats,
+        }
+
+
+def make_handler(server):
+    class ModelHandler(BaseHTTPRequestHandler):
+        def _send(self, status, body):
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send(200, {"status": "healthy"})
+            elif self.path == "/versions":
+                self._send(200, {"versions": server.versions()})
+            elif self.path == "/cache":
+                self._send(200, server.cache_info())
+            else:
+                self._send(404, {"error": "not found"})
+
+        def do_POST(self):
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                texts = body["texts"]
+                if self.path == "/predict":
+                    self._send(200, server.predict(texts, body.get("version")))
+                elif self.path == "/compare":
+                    self._send(200, {"results": server.compare(texts, body["versions"])})
+                else:
+                    self._send(404, {"error": "not found"})
+            except FileNotFoundError as e:
+                self._send(404, {"error": str(e)})
+            except KeyError as e:
+                self._send(400, {"error": f"missing field {e}"})
+            except (ValueError, TypeError) as e:
+                self._send(400, {"error": str(e)})
+
+        def log_message(self, format, *args):
+            pass
+
+    return ModelHandler
+
+
+def benchmark(server, texts, versions):
+    """Fan-out through the server (cold and warm) against loading and scoring each run separately."""
+    # Read every file once untimed, so the first path measured does not pay for a cold page cache
+    for version in versions:
+        ArtifactStore(server.store.root).load_run(version)
+
+    start = time.perf_counter()
+    for version in versions:
+        model, vectorizer = ArtifactStore(server.store.root).load_run(version)
+        model.predict(vectorizer.transform(texts))
+    separate = time.perf_counter() - start
+
+    start = time.perf_counter()
+    server.compare(texts, versions)
+    cold = time.perf_counter() - start
+
+    start = time.perf_counter()
+    server.compare(texts, versions)
+    warm = time.perf_counter() - start
+
+    print(f"📊 {len(texts)} reviews x {len(versions)} runs")
+    print(f"   load + score per run : {separate:7.2f}s")
+    print(f"   fan-out, cold cache  : {cold:7.2f}s")
+    print(f"   fan-out, warm cache  : {warm:7.2f}s ({separate / warm:.0f}x)")
+    print(f"   cache: {server.cache_info()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve IMDB sentiment predictions from any stored run.")
+    parser.add_argument("--host", type=str, default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--root", type=str, default="models")
+    parser.add_argument("--max-cache-mb", type=float, default=512)
+    parser.add_argument("--workers", type=int, default=4, help="Threads for loading and fan-out scoring")
+    parser.add_argument("--bench", type=str, default=None,
+                        help="JSONL file of reviews: benchmark fan-out over --bench-runs runs and exit")
+    parser.add_argument("--bench-runs", type=int, default=10)
+    args = parser.parse_args()
+
+    model_server = ModelServer(args.root, int(args.max_cache_mb * 1024 * 1024), args.workers)
+    if args.bench:
+        with open(args.bench) as f:
+            reviews = [json.loads(line)["text"] for line in f if line.strip()]
+        benchmark(model_server, reviews, model_server.versions()[-args.bench_runs:])
+    else:
+        httpd = ThreadingHTTPServer((args.host, args.port), make_handler(model_server))
+        print(f"🚀 Serving {len(model_server.versions())} runs on http://{args.host}:{args.port}", flush=True)
+        try:
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            httpd.server_close()
@@ -0,0 +1,109 @@
+import os
+import sys
+import json
+import argparse
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from train_model_lr import load_imdb, load_imdb_test, train
+from evaluate_model import evaluate
+from test_model import predict_samples
+
+# Shared helpers live in Labs/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "..", ".."))
+from common.profiling import StageProfiler
+
+STAGES = ("load", "train", "evaluate", "test")
+
+
+@dataclass
+class PipelineContext:
+    """State handed from one stage to the next inside a single process."""
+    timestamp: str
+    dataset: Any = None
+    test_split: Any = None
+    model: Any = None
+    vectorizer: Any = None
+    metrics: Dict[str, float] = field(default_factory=dict)
+    results: List[dict] = field(default_factory=list)
+    profile: List[dict] = field(default_factory=list)
+
+
+def _dataset(ctx: PipelineContext):
+    """The full IMDB dataset, downloaded once by `load` or `train` and then shared."""
+    if ctx.dataset is None:
+        ctx.dataset = load_imdb()
+    return ctx.dataset
+
+
+def _test_split(ctx: PipelineContext):
+    """The test split of the shared dataset, or, when nothing trained, just the cached test split."""
+    if ctx.dataset is not None:
+        return ctx.dataset["test"]
+    if ctx.test_split is None:
+        ctx.test_split = load_imdb_test()
+    return ctx.test_split
+
+
+def _stage_load(ctx: PipelineContext):
+    _dataset(ctx)
+
+
+def _stage_train(ctx: PipelineContext):
+    ctx.model, ctx.vectorizer, ctx.metrics["train"] = train(ctx.timestamp, _dataset(ctx))
+
+
+def _stage_evaluate(ctx: PipelineContext):
+    test_split = _test_split(ctx).select(range(500))
+    ctx.metrics["evaluate"] = evaluate(ctx.timestamp, ctx.model, ctx.vectorizer, test_split)
+
+
+def _stage_test(ctx: PipelineContext):
+    ctx.results = predict_samples(ctx.timestamp, ctx.model, ctx.vectorizer, _test_split(ctx))
+
+
+STAGE_FUNCS = {
+    "load": _stage_load,
+    "train": _stage_train,
+    "evaluate": _stage_evaluate,
+    "test": _stage_test,
+}
+
+
+def run_pipeline(timestamp: str, stages=STAGES, profile_path: Optional[str] = None) -> PipelineContext:
+    """
+    Run the selected stages in order in one warm process.
+
+    The full dataset is downloaded once, by `load` or `train`; without
+    either, evaluate and test share just the cached test split. They fall
+    back to the stored model and vectorizer when `train` is skipped, so
+    e.g. `--stages evaluate,test` scores an already stored run.
+    """
+    ctx = PipelineContext(timestamp=timestamp)
+    # Stages inside train() etc. nest under these; profile and trace go next to the run's metrics
+    with StageProfiler("imdb_lr_pipeline", out_dir="metrics", prefix=f"{timestamp}_") as profiler:
+        for name in stages:
+            with profiler.stage(name):
+                STAGE_FUNCS[name](ctx)
+    ctx.profile = profiler.summary()["stages"]
+
+    if profile_path:
+        with open(profile_path, "w") as f:
+            json.dump(ctx.profile, f, indent=4)
+    return ctx
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run train/evaluate/test in a single process.")
+    parser.add_argument("--timestamp", type=str, required=True)
+    parser.add_argument("--stages", type=str, default=",".join(STAGES),
+                        help=f"Comma-separated subset of {', '.join(STAGES)}")
+    parser.add_argument("--profile-out", type=str, default=None,
+                        help="Optional JSON file for the per-stage profile")
+    args = parser.parse_args()
+
+    requested = {s.strip() for s in args.stages.split(",") if s.strip()}
+    unknown = requested - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+    run_pipeline(args.timestamp, [s for s in STAGES if s in requested], args.profile_out)
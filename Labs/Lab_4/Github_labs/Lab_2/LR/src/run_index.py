@@ -0,0 +1,184 @@
+import os
+import glob
+import json
+import sqlite3
+import argparse
+import datetime
+
+INDEX_PATH = "metrics/runs.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    timestamp   TEXT PRIMARY KEY,
+    recorded_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    timestamp TEXT NOT NULL REFERENCES runs(timestamp),
+    name      TEXT NOT NULL,
+    value     REAL NOT NULL,
+    PRIMARY KEY (timestamp, name)
+);
+CREATE INDEX IF NOT EXISTS idx_metrics_name_value ON metrics(name, value);
+CREATE INDEX IF NOT EXISTS idx_metrics_name_timestamp ON metrics(name, timestamp);
+"""
+
+
+class RunIndex:
+    """
+    SQLite index over the IMDB pipeline run history.
+
+    Each run is one row in `runs` and every metric one row in `metrics`,
+    indexed on (name, value) and (name, timestamp) so best-K, trend and
+    regression queries never have to open the per-run JSON files.
+    """
+
+    def __init__(self, path=INDEX_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+    def _upsert(self, timestamp, metrics):
+        self.conn.execute(
+            "INSERT OR IGNORE INTO runs (timestamp, recorded_at) VALUES (?, ?)",
+            (timestamp, datetime.datetime.now().isoformat(timespec="seconds")),
+        )
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO metrics (timestamp, name, value) VALUES (?, ?, ?)",
+            [(timestamp, name, float(value)) for name, value in metrics.items()],
+        )
+
+    def record(self, timestamp, metrics):
+        """Add or update the metrics of a single run."""
+        with self.conn:
+            self._upsert(timestamp, metrics)
+
+    def backfill(self, metrics_dir="metrics", results_dir="results"):
+        """(Re)build the index from the metrics/ and results/ JSON files; safe to rerun."""
+        count = 0
+        with self.conn:
+            for path in sorted(glob.glob(os.path.join(metrics_dir, "*_metrics.json"))):
+                timestamp = os.path.basename(path)[: -len("_metrics.json")]
+                with open(path) as f:
+                    self._upsert(timestamp, json.load(f))
+                count += 1
+            for path in sorted(glob.glob(os.path.join(results_dir, "*_test_results.json"))):
+                timestamp = os.path.basename(path)[: -len("_test_results.json")]
+                with open(path) as f:
+                    self._upsert(timestamp, summarize_results(json.load(f)))
+        return count
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def best(self, metric="f1_score", k=5):
+        return self.conn.execute(
+            "SELECT timestamp, value FROM metrics WHERE name = ? "
+            "ORDER BY value DESC, timestamp DESC LIMIT ?",
+            (metric, k),
+        ).fetchall()
+
+    def latest(self, metric="f1_score", k=1):
+        return self.conn.execute(
+            "SELECT timestamp, value FROM metrics WHERE name = ? "
+            "ORDER BY timestamp DESC LIMIT ?",
+            (metric, k),
+        ).fetchall()
+
+    def trend(self, metric="f1_score", last=30):
+        """Last N values of a metric in time order with the change from the previous run."""
+        rows = self.conn.execute(
+            "SELECT timestamp, value, value - LAG(value) OVER (ORDER BY timestamp) "
+            "FROM metrics WHERE name = ? ORDER BY timestamp DESC LIMIT ?",
+            (metric, last),
+        ).fetchall()
+        return rows[::-1]
+
+    def regressions(self, metric="f1_score", threshold=0.01):
+        """Runs whose metric fell more than threshold below the previous run."""
+        return self.conn.execute(
+            """
+            SELECT timestamp, value, previous, best_before FROM (
+                SELECT timestamp, value,
+                       LAG(value) OVER w AS previous,
+                       MAX(value) OVER (w ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING) AS best_before
+                FROM metrics WHERE name = ?
+                WINDOW w AS (ORDER BY timestamp)
+            )
+            WHERE previous IS NOT NULL AND value < previous - ?
+            ORDER BY timestamp
+            """,
+            (metric, threshold),
+        ).fetchall()
+
+
+def summarize_results(results):
+    """Reduce a test_model.py results list to index metrics."""
+    correct = sum(int(r["predicted_label"] == r["actual_label"]) for r in results)
+    return {
+        "test_samples": len(results),
+        "test_accuracy": correct / len(results) if results else 0.0,
+    }
+
+
+def _print_rows(header, rows):
+    print(" | ".join(header))
+    for row in rows:
+        print(" | ".join("-" if v is None else f"{v:.4f}" if isinstance(v, float) else str(v) for v in row))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query the IMDB run index.")
+    parser.add_argument("--db", type=str, default=INDEX_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    backfill = sub.add_parser("backfill", help="Import existing metrics/ and results/ JSON files")
+    backfill.add_argument("--metrics-dir", type=str, default="metrics")
+    backfill.add_argument("--results-dir", type=str, default="results")
+
+    best = sub.add_parser("best", help="Top-K runs by a metric")
+    best.add_argument("--metric", type=str, default="f1_score")
+    best.add_argument("-k", type=int, default=5)
+
+    latest = sub.add_parser("latest", help="Most recent runs")
+    latest.add_argument("--metric", type=str, default="f1_score")
+    latest.add_argument("-k", type=int, default=1)
+
+    trend = sub.add_parser("trend", help="Metric over the last N runs")
+    trend.add_argument("--metric", type=str, default="f1_score")
+    trend.add_argument("--last", type=int, default=30)
+
+    regressions = sub.add_parser("regressions", help="Runs where a metric dropped")
+    regressions.add_argument("--metric", type=str, default="f1_score")
+    regressions.add_argument("--threshold", type=float, default=0.01)
+    args = parser.parse_args()
+
+    with RunIndex(args.db) as index:
+        if args.command == "backfill":
+            count = index.backfill(args.metrics_dir, args.results_dir)
+            print(f"📥 Indexed {count} runs into {args.db}")
+        elif args.command == "best":
+            _print_rows(["timestamp", args.metric], index.best(args.metric, args.k))
+        elif args.command == "latest":
+            _print_rows(["timestamp", args.metric], index.latest(args.metric, args.k))
+        elif args.command == "trend":
+            _print_rows(["timestamp", args.metric, "delta"], index.trend(args.metric, args.last))
+        elif args.command == "regressions":
+            _print_rows(
+                ["timestamp", args.metric, "previous", "best_before"],
+                index.regressions(args.metric, args.threshold),
+            )
@@ -2,35 +2,32 @@ import os
 import json
 import argparse
 from datasets import load_dataset
-from joblib import load
+from artifact_store import ArtifactStore
+from run_index import RunIndex, summarize_results
 
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--timestamp", type=str, required=True)
-    args = parser.parse_args()
-    timestamp = args.timestamp
-
-    model_path = f"models/model_{timestamp}_lr.joblib"
-    vectorizer_path = f"models/vectorizer_{timestamp}.joblib"
-
-    if not os.path.exists(model_path):
-        raise FileNotFoundError(f"❌ Model file not found at {model_path}")
-    if not os.path.exists(vectorizer_path):
-        raise FileNotFoundError(f"❌ Vectorizer not found at {vectorizer_path}")
 
-    print(f"✅ Loaded model from {model_path}")
-    print(f"✅ Loaded vectorizer from {vectorizer_path}")
+def predict_samples(timestamp, model=None, vectorizer=None, test_split=None):
+    """
+    Predict a few unseen IMDB reviews and save them to results/.
 
-    model = load(model_path)
-    vectorizer = load(vectorizer_path)
+    Args:
+        timestamp (str): Run identifier.
+        model, vectorizer: In-memory estimators; loaded from the store when omitted.
+        test_split (Dataset): Preloaded IMDB test split; downloaded when omitted.
+    Returns:
+        list: One dict per scored review.
+    """
+    if model is None or vectorizer is None:
+        model, vectorizer = ArtifactStore().load_run(timestamp)
+        print(f"✅ Loaded model and vectorizer for run {timestamp}")
 
-    print("📥 Loading IMDB test dataset...")
-    dataset = load_dataset("imdb")
-    test_data = dataset["test"]
+    if test_split is None:
+        print("📥 Loading IMDB test dataset...")
+        test_split = load_dataset("imdb")["test"]
 
     # Use a few unseen reviews for demonstration
-    X_samples = test_data["text"][:5]
-    y_true = test_data["label"][:5]
+    X_samples = test_split["text"][:5]
+    y_true = test_split["label"][:5]
 
     print("🧪 Making predictions...")
     X_vec = vectorizer.transform(X_samples)
@@ -49,6 +46,16 @@ if __name__ == "__main__":
     result_path = f"results/{timestamp}_test_results.json"
     with open(result_path, "w") as f:
         json.dump(results, f, indent=4)
+    with RunIndex() as index:
+        index.record(timestamp, summarize_results(results))
 
     print(f"✅ Test predictions saved to {result_path}")
     print(json.dumps(results, indent=4))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--timestamp", type=str, required=True)
+    args = parser.parse_args()
+    predict_samples(args.timestamp)
@@ -0,0 +1,158 @@
+import os
+import time
+import shutil
+import argparse
+import tempfile
+import mlflow
+from mlflow.entities import Metric, Param, RunTag, ViewType
+from mlflow.tracking import MlflowClient
+
+# One SQLite file instead of a directory per experiment and a file per param/metric
+TRACKING_URI = os.environ.get("MLFLOW_TRACKING_URI", "sqlite:///mlruns.db")
+EXPERIMENT_NAME = "IMDB_LogReg"
+LEGACY_EXPERIMENT_PREFIX = "IMDB_LogReg_"
+
+
+class RunTracker:
+    """
+    Thin MLflow wrapper for the nightly IMDB runs.
+
+    All runs go to one experiment (created once, then looked up by name), and
+    each run is recorded with a single log_batch call carrying every param,
+    metric and tag, instead of one request / file per value.
+    """
+
+    def __init__(self, tracking_uri=TRACKING_URI, experiment_name=EXPERIMENT_NAME):
+        self.client = MlflowClient(tracking_uri)
+        self.experiment_name = experiment_name
+        self._experiment_id = None
+
+    @property
+    def experiment_id(self):
+        if self._experiment_id is None:
+            experiment = self.client.get_experiment_by_name(self.experiment_name)
+            if experiment is None:
+                self._experiment_id = self.client.create_experiment(self.experiment_name)
+            else:
+                self._experiment_id = experiment.experiment_id
+        return self._experiment_id
+
+    def log_run(self, run_name, params=None, metrics=None, tags=None, start_time=None):
+        """Create, fill and close a run in three tracking calls; returns the run id."""
+        now = int(time.time() * 1000)
+        run = self.client.create_run(self.experiment_id, start_time=start_time or now, run_name=run_name)
+        self.client.log_batch(
+            run.info.run_id,
+            metrics=[Metric(key, float(value), now, 0) for key, value in (metrics or {}).items()],
+            params=[Param(key, str(value)) for key, value in (params or {}).items()],
+            tags=[RunTag(key, str(value)) for key, value in (tags or {}).items()],
+        )
+        self.client.set_terminated(run.info.run_id, end_time=now)
+        return run.info.run_id
+
+    def list_runs(self, max_results=1000, order_by=("attributes.start_time DESC",)):
+        """Runs of the experiment, newest first, following MLflow's pagination."""
+        runs, token = [], None
+        while True:
+            page = self.client.search_runs(
+                [self.experiment_id], max_results=min(max_results - len(runs), 1000),
+                order_by=list(order_by), page_token=token,
+            )
+            runs.extend(page)
+            token = page.token
+            if not token or len(runs) >= max_results:
+                return runs
+
+    def import_legacy(self, legacy_uri="./mlruns", prefix=LEGACY_EXPERIMENT_PREFIX):
+        """
+        Copy runs from the old one-experiment-per-run file store into the single experiment.
+
+        Experiments already recorded in a legacy_experiment tag are skipped,
+        so running the import again only copies what is new.
+        """
+        done = {run.data.tags.get("legacy_experiment") for run in self.list_runs(max_results=1_000_000)}
+        legacy = MlflowClient(legacy_uri)
+        imported = 0
+        for experiment in legacy.search_experiments(view_type=ViewType.ALL, max_results=50_000):
+            if not experiment.name.startswith(prefix) or experiment.name in done:
+                continue
+            for run in legacy.search_runs([experiment.experiment_id], max_results=1000):
+                self.log_run(
+                    run.info.run_name,
+                    params=run.data.params,
+                    metrics=run.data.metrics,
+                    tags={"legacy_experiment": experiment.name},
+                    start_time=run.info.start_time,
+                )
+                imported += 1
+        return imported
+
+
+def _log_legacy(tracking_uri, i, params, metrics):
+    """What train_model_lr.py used to do: a fresh experiment, then log_params and log_metrics in one run."""
+    mlflow.set_tracking_uri(tracking_uri)
+    experiment_id = mlflow.create_experiment(f"{LEGACY_EXPERIMENT_PREFIX}{i:06d}")
+    with mlflow.start_run(experiment_id=experiment_id, run_name="IMDB_LogisticRegression"):
+        mlflow.log_params(params)
+        mlflow.log_metrics(metrics)
+
+
+def benchmark(n_runs=1000):
+    """Time logging and listing n_runs runs: legacy file-store layout vs one SQLite-backed experiment."""
+    params = {"model": "LogisticRegression", "dataset": "IMDB", "vectorizer": "TF-IDF", "features": 2000}
+    metrics = {"accuracy": 0.84, "f1_score": 0.83}
+    tmp = tempfile.mkdtemp()
+    try:
+        legacy_uri = os.path.join(tmp, "mlruns")
+        start = time.perf_counter()
+        for i in range(n_runs):
+            _log_legacy(legacy_uri, i, params, metrics)
+        legacy_log = time.perf_counter() - start
+
+        legacy = MlflowClient(legacy_uri)
+        start = time.perf_counter()
+        experiments = legacy.search_experiments(view_type=ViewType.ALL, max_results=50_000)
+        ids = [e.experiment_id for e in experiments if e.name.startswith(LEGACY_EXPERIMENT_PREFIX)]
+        legacy_runs = []
+        # The file store searches at most 100 experiments per call
+        for i in range(0, len(ids), 100):
+            legacy_runs += legacy.search_runs(ids[i:i + 100], max_results=1000)
+        legacy_list = time.perf_counter() - start
+
+        tracker = RunTracker(f"sqlite:///{os.path.join(tmp, 'mlruns.db')}")
+        start = time.perf_counter()
+        for _ in range(n_runs):
+            tracker.log_run("IMDB_LogisticRegression", params, metrics)
+        batched_log = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batched_runs = tracker.list_runs(max_results=n_runs)
+        batched_list = time.perf_counter() - start
+
+        files = sum(len(f) for _, _, f in os.walk(os.path.join(tmp, "mlruns")))
+        print(f"📊 {n_runs} runs")
+        print(f"   file store, experiment per run : log {legacy_log:7.2f}s | list {legacy_list:6.2f}s "
+              f"({len(legacy_runs)} runs, {files:,} files)")
+        print(f"   sqlite, one experiment, batched: log {batched_log:7.2f}s | list {batched_list:6.2f}s "
+              f"({len(batched_runs)} runs, 1 file)")
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="IMDB experiment tracking helpers.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="List tracked runs, newest first")
+    imp = sub.add_parser("import", help="Copy runs from the old ./mlruns file store")
+    imp.add_argument("--legacy-uri", type=str, default="./mlruns")
+    bench = sub.add_parser("bench", help="Benchmark logging and listing at scale")
+    bench.add_argument("--runs", type=int, default=1000)
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        benchmark(args.runs)
+    elif args.command == "import":
+        print(f"📦 Imported {RunTracker().import_legacy(args.legacy_uri)} runs into {TRACKING_URI}")
+    else:
+        for run in RunTracker().list_runs():
+            print(run.info.run_name, run.data.tags.get("run_timestamp", ""), run.data.metrics)
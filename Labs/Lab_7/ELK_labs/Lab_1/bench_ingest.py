@@ -0,0 +1,121 @@
+import os
+import re
+import json
+import time
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+# Python equivalents of the two grok patterns and the date filter in the old logstash.conf
+LINE_RE = re.compile(
+    r"^(?P<timestamp>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3}) - "
+    r"(?P<log_level>[A-Z]+) - (?P<log_message>.*)$"
+)
+METRIC_RE = re.compile(r"Accuracy: (?P<accuracy>[-+]?\d*\.?\d+).*F1 Score: (?P<f1_score>[-+]?\d*\.?\d+)")
+
+
+def synthetic_runs(n_runs):
+    """Yield (text_lines, json_events) for n_runs training runs, as the old and new script log them."""
+    ts = datetime(2025, 10, 27, 13, 44, 29)
+    for run in range(n_runs):
+        ts += timedelta(seconds=30)
+        stamp = ts.strftime("%Y-%m-%d %H:%M:%S,") + f"{run % 1000:03d}"
+        iso = ts.isoformat(timespec="milliseconds") + "+00:00"
+        acc, f1 = 0.70 + (run % 10) / 100, 0.60 + (run % 7) / 100
+        text = [
+            "Dataset loaded successfully.", "Shape: (891, 12)",
+            "Training samples: 571, Test samples: 143", "Starting training...", "Training complete.",
+            f"Accuracy: {acc:.2f}", f"F1 Score: {f1:.2f}", "Confusion Matrix: [[71, 16], [20, 36]]",
+            "TP: 36, TN: 71, FP: 16, FN: 20", "Model coefficients: [[-1.2, 2.6, -0.04, -0.35, -0.05, 0.002]]",
+            "Model intercept: [2.83]", "Model evaluation completed.",
+        ]
+        events = [
+            {"event": "dataset_loaded", "rows": 891, "columns": 12},
+            {"event": "split", "train_samples": 571, "test_samples": 143},
+            {"event": "training_started"},
+            {"event": "training_complete", "duration_s": 0.01},
+            {"event": "metrics", "accuracy": acc, "f1_score": f1, "tp": 36, "tn": 71, "fp": 16, "fn": 20,
+             "confusion_matrix": [[71, 16], [20, 36]]},
+            {"event": "model", "coefficients": [-1.2, 2.6, -0.04, -0.35, -0.05, 0.002], "intercept": 2.83},
+            {"event": "evaluation_complete"},
+        ]
+        yield (
+            [f"{stamp} - INFO - {message}\n" for message in text],
+            [json.dumps({"@timestamp": iso, "log_level": "INFO", "log_message": e["event"], **e}) + "\n"
+             for e in events],
+        )
+
+
+def ingest_exec_cat(path):
+    """Old pipeline, one interval: re-read the whole file, two regexes + date parse per line."""
+    indexed = 0
+    with open(path) as f:
+        for line in f:
+            match = LINE_RE.match(line.rstrip("\n"))
+            if not match:
+                continue
+            doc = match.groupdict()
+            metrics = METRIC_RE.search(doc["log_message"])
+            if metrics:
+                doc.update({k: float(v) for k, v in metrics.groupdict().items()})
+            doc["@timestamp"] = datetime.strptime(doc["timestamp"], "%Y-%m-%d %H:%M:%S,%f")
+            indexed += 1
+    return indexed
+
+
+def ingest_tail_json(path, offset):
+    """New pipeline, one interval: read only bytes appended since the last offset, json-decode once."""
+    indexed = 0
+    with open(path) as f:
+        f.seek(offset)
+        for line in f:
+            json.loads(line)
+            indexed += 1
+        return indexed, f.tell()
+
+
+def benchmark(n_runs, intervals):
+    """
+    Grow both logs to n_runs training runs over `intervals` polling intervals
+    and measure the CPU spent ingesting them.
+    """
+    runs = list(synthetic_runs(n_runs))
+    per_interval = max(1, n_runs // intervals)
+    with tempfile.TemporaryDirectory() as tmp:
+        text_path, json_path = os.path.join(tmp, "training.log"), os.path.join(tmp, "training.jsonl")
+        open(text_path, "w").close()
+        open(json_path, "w").close()
+        text_cpu = json_cpu = 0.0
+        text_docs = json_docs = offset = 0
+        for i in range(0, n_runs, per_interval):
+            with open(text_path, "a") as t, open(json_path, "a") as j:
+                for text, events in runs[i:i + per_interval]:
+                    t.writelines(text)
+                    j.writelines(events)
+
+            start = time.process_time()
+            text_docs += ingest_exec_cat(text_path)
+            text_cpu += time.process_time() - start
+
+            start = time.process_time()
+            docs, offset = ingest_tail_json(json_path, offset)
+            json_docs += docs
+            json_cpu += time.process_time() - start
+
+        text_lines = sum(len(text) for text, _ in runs)
+        json_lines = sum(len(events) for _, events in runs)
+        print(f"{n_runs:,} runs over {intervals} intervals")
+        print(f"exec cat + grok : {text_cpu:7.2f}s CPU | {text_docs:>10,} docs indexed "
+              f"for {text_lines:,} lines ({text_docs / text_lines:.0f}x re-ingested)")
+        print(f"file tail + json: {json_cpu:7.2f}s CPU | {json_docs:>10,} docs indexed "
+              f"for {json_lines:,} lines")
+        print(f"speed-up        : {text_cpu / json_cpu:7.1f}x")
+    return text_cpu, json_cpu
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare Logstash ingestion strategies on a synthetic log.")
+    parser.add_argument("--runs", type=int, default=10_000, help="Training runs in the synthetic log")
+    parser.add_argument("--intervals", type=int, default=50, help="Polling intervals while the log grows")
+    args = parser.parse_args()
+    benchmark(args.runs, args.intervals)
@@ -0,0 +1,74 @@
+import os
+import time
+import argparse
+import tempfile
+
+from es_shipper import BulkShipper
+from es_stub import start_stub
+
+
+def synthetic_events(n):
+    for i in range(n):
+        yield {"@timestamp": "2025-10-27T17:44:29.746+00:00", "log_level": "INFO",
+               "log_message": "Accuracy: 0.75, F1 Score: 0.67", "event": "metrics",
+               "run": i, "accuracy": 0.75, "f1_score": 0.67, "tp": 36, "tn": 71, "fp": 16, "fn": 20}
+
+
+def ship(url, n_events, spool_path, **kwargs):
+    shipper = BulkShipper(url, "bench", spool_path=spool_path, **kwargs)
+    start = time.perf_counter()
+    for event in synthetic_events(n_events):
+        shipper.add(event)
+    shipper.close()
+    return time.perf_counter() - start, shipper.stats
+
+
+def bench_throughput(n_events, batch_sizes, tmp):
+    """Events/s and requests for one document per request vs bulk batches."""
+    for max_docs in batch_sizes:
+        server = start_stub()
+        events = n_events if max_docs > 1 else min(n_events, 2_000)
+        elapsed, stats = ship(server.url, events, os.path.join(tmp, "spool.jsonl"),
+                              max_docs=max_docs, flush_interval=60)
+        assert server.count("bench") == events
+        print(f"max_docs={max_docs:<6} {events:>8,} events in {elapsed:6.2f}s | "
+              f"{events / elapsed:>10,.0f} events/s | {stats['requests']:>6,} requests")
+        server.shutdown()
+        server.server_close()
+
+
+def bench_faults(n_events, tmp):
+    """Retries against a flaky cluster, then spooling while it is down and draining once it is back."""
+    spool_path = os.path.join(tmp, "spool.jsonl")
+
+    server = start_stub(fail_rate=0.3, item_fail_rate=0.05, seed=0)
+    elapsed, stats = ship(server.url, n_events, spool_path, max_docs=500, backoff=0.01)
+    print(f"flaky cluster: {server.count('bench'):,}/{n_events:,} indexed in {elapsed:.2f}s | "
+          f"{stats['requests']} requests, {stats['retries']} retries, {stats['spooled']} spooled")
+    server.shutdown()
+    server.server_close()
+
+    # Nothing is listening on this port
+    down_url = server.url
+    elapsed, stats = ship(down_url, n_events, spool_path, max_docs=500, max_retries=2, backoff=0.01)
+    print(f"cluster down : {stats['spooled']:,} events spooled in {elapsed:.2f}s")
+
+    server = start_stub()
+    shipper = BulkShipper(server.url, "bench", spool_path=spool_path, max_docs=500)
+    start = time.perf_counter()
+    shipper.close()  # flush drains the spool before any new batch
+    print(f"cluster back : {server.count('bench'):,} spooled events indexed in "
+          f"{time.perf_counter() - start:.2f}s, spool left: {os.path.exists(spool_path)}")
+    server.shutdown()
+    server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the bulk shipper against the local _bulk stub.")
+    parser.add_argument("--events", type=int, default=50_000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 100, 500, 2000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bench_throughput(args.events, args.batch_sizes, tmp)
+        bench_faults(min(args.events, 10_000), tmp)
@@ -0,0 +1,206 @@
+import os
+import json
+import time
+import random
+import logging
+import threading
+import urllib.error
+import urllib.request
+
+from json_logging import JsonFormatter, _to_builtin
+
+logger = logging.getLogger("es_shipper")
+
+SPOOL_PATH = "es_spool.jsonl"
+# Bulk item / request statuses worth retrying; anything else is a bad document
+RETRYABLE_STATUS = {429, 502, 503, 504}
+
+
+class BulkShipper:
+    """
+    Buffer documents and index them with the Elasticsearch `_bulk` API.
+
+    A batch is sent when it reaches `max_docs` documents or `max_bytes` of
+    NDJSON, or after `flush_interval` seconds. Failed requests and retryable
+    item failures are retried with exponential backoff; whatever still fails
+    is appended to an on-disk spool and re-sent before the next batch once
+    the cluster answers again.
+    """
+
+    def __init__(self, url="http://localhost:9200", index="ml_training_logs", max_docs=500,
+                 max_bytes=5 * 1024 * 1024, flush_interval=1.0, max_retries=5, backoff=0.5,
+                 max_backoff=30.0, timeout=10.0, spool_path=SPOOL_PATH):
+        self.bulk_url = url.rstrip("/") + "/_bulk"
+        self.index = index
+        self.max_docs = max_docs
+        self.max_bytes = max_bytes
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.spool_path = spool_path
+        self.stats = {"sent": 0, "requests": 0, "retries": 0, "spooled": 0, "dropped": 0}
+
+        self._action = json.dumps({"index": {"_index": index}}).encode() + b"\n"
+        self._buffer = []
+        self._buffer_bytes = 0
+        self._lock = threading.Lock()
+        # Serializes sending so batches and the spool stay in order
+        self._send_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_periodically, args=(flush_interval,),
+                                         name="es-shipper", daemon=True)
+        self._flusher.start()
+
+    # ---- Buffering ----
+
+    def add(self, doc):
+        line = json.dumps(doc, default=_to_builtin).encode() + b"\n"
+        with self._lock:
+            self._buffer.append(line)
+            self._buffer_bytes += len(self._action) + len(line)
+            full = len(self._buffer) >= self.max_docs or self._buffer_bytes >= self.max_bytes
+        if full:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            docs, self._buffer, self._buffer_bytes = self._buffer, [], 0
+        with self._send_lock:
+            if os.path.exists(self.spool_path) and not self._drain_spool():
+                # Cluster still unreachable: queue behind the spool instead of retrying again
+                self._spool(docs)
+                return
+            if docs:
+                self._spool(self._send(docs))
+
+    def close(self):
+        self._closed.set()
+        self._flusher.join()
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _flush_periodically(self, interval):
+        while not self._closed.wait(interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Periodic flush failed")
+
+    # ---- Sending ----
+
+    def _send(self, docs, retries=None):
+        """Send docs in max_docs/max_bytes batches; returns the docs that could not be indexed."""
+        batches, batch, size = [], [], 0
+        for doc in docs:
+            if batch and (len(batch) >= self.max_docs or size + len(doc) > self.max_bytes):
+                batches.append(batch)
+                batch, size = [], 0
+            batch.append(doc)
+            size += len(self._action) + len(doc)
+        if batch:
+            batches.append(batch)
+
+        failed = []
+        for i, batch in enumerate(batches):
+            rejected = self._send_with_retry(batch, retries)
+            failed += rejected
+            if rejected and len(rejected) == len(batch):
+                # Nothing got through: the cluster is down, keep the rest for later
+                failed += [doc for rest in batches[i + 1:] for doc in rest]
+                break
+        return failed
+
+    def _send_with_retry(self, docs, retries=None):
+        pending = docs
+        retries = self.max_retries if retries is None else retries
+        for attempt in range(retries + 1):
+            if attempt:
+                self.stats["retries"] += 1
+                delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+                time.sleep(delay * random.uniform(0.5, 1.0))
+            try:
+                pending = self._post(pending)
+            except urllib.error.HTTPError as e:
+                if e.code not in RETRYABLE_STATUS:
+                    logger.warning("Bulk request rejected with %s; dropping %d docs", e.code, len(pending))
+                    self.stats["dropped"] += len(pending)
+                    return []
+            except (urllib.error.URLError, OSError) as e:
+                logger.debug("Bulk request failed: %s", e)
+            if not pending:
+                return []
+        return pending
+
+    def _post(self, docs):
+        """One _bulk request; returns the docs whose items failed with a retryable status."""
+        body = b"".join(self._action + doc for doc in docs)
+        request = urllib.request.Request(self.bulk_url, data=body, method="POST",
+                                         headers={"Content-Type": "application/x-ndjson"})
+        self.stats["requests"] += 1
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            result = json.loads(response.read())
+
+        if not result.get("errors"):
+            self.stats["sent"] += len(docs)
+            return []
+        retry = []
+        for doc, item in zip(docs, result["items"]):
+            status = next(iter(item.values()))["status"]
+            if status in RETRYABLE_STATUS:
+                retry.append(doc)
+            elif status >= 300:
+                self.stats["dropped"] += 1
+            else:
+                self.stats["sent"] += 1
+        return retry
+
+    # ---- Spool ----
+
+    def _spool(self, docs):
+        if not docs:
+            return
+        with open(self.spool_path, "ab") as f:
+            f.writelines(docs)
+        self.stats["spooled"] += len(docs)
+
+    def _drain_spool(self):
+        """Re-send spooled docs once; returns False if nothing got through (cluster still down)."""
+        with open(self.spool_path, "rb") as f:
+            docs = f.readlines()
+        # A single attempt: whatever fails stays spooled for the next flush
+        failed = self._send(docs, retries=0)
+        if failed:
+            with open(self.spool_path + ".tmp", "wb") as f:
+                f.writelines(failed)
+            os.replace(self.spool_path + ".tmp", self.spool_path)
+        else:
+            os.remove(self.spool_path)
+        return len(failed) < len(docs)
+
+
+class ShipperHandler(logging.Handler):
+    """Logging handler that ships each record as a JSON document through a BulkShipper."""
+
+    def __init__(self, shipper, level=logging.NOTSET):
+        super().__init__(level)
+        self.shipper = shipper
+        self.formatter = JsonFormatter()
+
+    def emit(self, record):
+        # The shipper's own warnings would otherwise feed back into it
+        if record.name == logger.name:
+            return
+        try:
+            self.shipper.add(self.formatter.to_dict(record))
+        except Exception:
+            self.handleError(record)
+
+    def close(self):
+        self.shipper.close()
+        super().close()
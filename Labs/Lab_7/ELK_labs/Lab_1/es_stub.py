@@ -0,0 +1,121 @@
+import json
+import random
+import argparse
+import threading
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class BulkStubServer(ThreadingHTTPServer):
+    """
+    In-memory stand-in for the parts of Elasticsearch the shipper uses:
+    `POST /_bulk`, `GET /<index>/_count` and `GET /`.
+
+    `fail_rate` answers that fraction of bulk requests with 503, and
+    `item_fail_rate` rejects that fraction of documents with 429, to exercise
+    retries and the spool offline.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, fail_rate=0.0, item_fail_rate=0.0, seed=None):
+        super().__init__(address, BulkStubHandler)
+        self.fail_rate = fail_rate
+        self.item_fail_rate = item_fail_rate
+        self.rng = random.Random(seed)
+        self.indices = defaultdict(list)
+        self.bulk_requests = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, index):
+        with self.lock:
+            return len(self.indices[index])
+
+
+class BulkStubHandler(BaseHTTPRequestHandler):
+    def _send(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        path = self.path.strip("/")
+        if not path:
+            self._send(200, {"name": "es-stub", "version": {"number": "7.17.4"}, "tagline": "You Know, for Search"})
+        elif path.endswith("/_count"):
+            self._send(200, {"count": self.server.count(path[:-len("/_count")])})
+        else:
+            self._send(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path.split("?")[0].rstrip("/") != "/_bulk":
+            self._send(404, {"error": "not found"})
+            return
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        server = self.server
+        with server.lock:
+            server.bulk_requests += 1
+            if server.rng.random() < server.fail_rate:
+                self._send(503, {"error": "unavailable"})
+                return
+
+        lines = body.splitlines()
+        if len(lines) % 2:
+            self._send(400, {"error": "bulk body must be action/document line pairs"})
+            return
+        items, errors = [], False
+        with server.lock:
+            for action_line, doc_line in zip(lines[::2], lines[1::2]):
+                index = json.loads(action_line)["index"]["_index"]
+                if server.rng.random() < server.item_fail_rate:
+                    errors = True
+                    items.append({"index": {"_index": index, "status": 429,
+                                            "error": {"type": "es_rejected_execution_exception"}}})
+                    continue
+                try:
+                    doc = json.loads(doc_line)
+                except ValueError:
+                    errors = True
+                    items.append({"index": {"_index": index, "status": 400,
+                                            "error": {"type": "mapper_parsing_exception"}}})
+                    continue
+                server.indices[index].append(doc)
+                items.append({"index": {"_index": index, "_id": str(len(server.indices[index])),
+                                        "status": 201, "result": "created"}})
+        self._send(200, {"took": 1, "errors": errors, "items": items})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub(host="127.0.0.1", port=0, **kwargs):
+    """Start a stub in a background thread (port 0 picks a free port)."""
+    server = BulkStubServer((host, port), **kwargs)
+    threading.Thread(target=server.serve_forever, name="es-stub", daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local Elasticsearch _bulk stand-in.")
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9200)
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fraction of bulk requests answered 503")
+    parser.add_argument("--item-fail-rate", type=float, default=0.0, help="Fraction of documents rejected 429")
+    args = parser.parse_args()
+
+    server = BulkStubServer((args.host, args.port), args.fail_rate, args.item_fail_rate)
+    print(f"Elasticsearch stub listening on {server.url}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
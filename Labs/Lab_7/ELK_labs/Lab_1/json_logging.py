@@ -0,0 +1,58 @@
+import json
+import logging
+from datetime import datetime, timezone
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line. Fields passed via `extra` are written as typed
+    top-level keys, so Logstash's json codec indexes them without grok.
+    """
+
+    def format(self, record):
+        return json.dumps(self.to_dict(record), default=_to_builtin)
+
+    def to_dict(self, record):
+        event = {
+            "@timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc)
+            .isoformat(timespec="milliseconds"),
+            "log_level": record.levelname,
+            "log_message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                event[key] = value
+        if record.exc_info:
+            event["exception"] = self.formatException(record.exc_info)
+        return event
+
+
+def _to_builtin(value):
+    # numpy scalars and arrays
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return str(value)
+
+
+def setup_json_logging(path, level=logging.INFO, es_url=None, index="ml_training_logs"):
+    """
+    Log JSON lines to `path`. With `es_url`, events are also bulk-indexed
+    straight into Elasticsearch (see es_shipper.BulkShipper).
+    """
+    handler = logging.FileHandler(path)
+    handler.setFormatter(JsonFormatter())
+    logger = logging.getLogger()
+    logger.setLevel(level)
+    logger.addHandler(handler)
+    if es_url:
+        from es_shipper import BulkShipper, ShipperHandler
+        logger.addHandler(ShipperHandler(BulkShipper(es_url, index)))
+    return logger
+
+
+def log_event(event, message, **fields):
+    """Log `message` tagged with an `event` name and typed metric fields."""
+    logging.info(message, extra={"event": event, **fields})
@@ -1,60 +1,94 @@
-import logging
-import pandas as pd
+import os
+import sys
+import time
 from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import accuracy_score, f1_score, confusion_matrix
 import numpy as np
 
-# Configure logging
-logging.basicConfig(
-    filename='training.log',
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+from json_logging import setup_json_logging, log_event
 
-# Load Titanic dataset
+# Shared helpers live in Labs/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
+from common.remote_csv import read_remote_csv
+from common.profiling import profile_run, stage
+
+# Configure logging: one JSON event per line, tailed by Logstash's json codec.
+# With ES_URL set, events are also bulk-indexed directly (see es_shipper.py)
+LOG_PATH = 'training.jsonl'
+setup_json_logging(LOG_PATH, es_url=os.environ.get("ES_URL"))
+
+# Load Titanic dataset: cached locally after the first download, only the
+# needed columns, parsed straight into compact types
 url = "https://raw.githubusercontent.com/datasciencedojo/datasets/master/titanic.csv"
-data = pd.read_csv(url)
+DTYPES = {
+    "Survived": "int8",
+    "Pclass": "int8",
+    "Sex": "category",
+    "Age": "float32",
+    "SibSp": "int8",
+    "Parch": "int8",
+    "Fare": "float32",
+}
+
+# Wall/CPU time and peak RSS per stage, saved as training_profile.json + training_trace.json
+# when the block exits, even if a stage fails
+with profile_run("titanic_logreg", out_dir=".", prefix="training_") as profiler:
+    with stage("load"):
+        data = read_remote_csv(url, usecols=list(DTYPES), dtype=DTYPES)
 
-logging.info("Dataset loaded successfully.")
-logging.info(f"Shape: {data.shape}")
+    log_event("dataset_loaded", f"Dataset loaded successfully. Shape: {data.shape}",
+              rows=data.shape[0], columns=data.shape[1])
 
-# Preprocessing
-data = data[["Survived", "Pclass", "Sex", "Age", "SibSp", "Parch", "Fare"]]
-data.dropna(inplace=True)
-data["Sex"] = data["Sex"].map({"male": 0, "female": 1})
+    # Preprocessing
+    with stage("preprocess"):
+        data = data.dropna()
+        data["Sex"] = (data["Sex"] == "female").astype("int8")
 
-X = data.drop("Survived", axis=1)
-y = data["Survived"]
+        X = data.drop("Survived", axis=1)
+        y = data["Survived"]
 
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
-logging.info(f"Training samples: {len(X_train)}, Test samples: {len(X_test)}")
+    log_event("split", f"Training samples: {len(X_train)}, Test samples: {len(X_test)}",
+              train_samples=len(X_train), test_samples=len(X_test))
 
-# Train model
-model = LogisticRegression(max_iter=500)
-logging.info("Starting training...")
-model.fit(X_train, y_train)
-logging.info("Training complete.")
+    # Train model
+    model = LogisticRegression(max_iter=500)
+    log_event("training_started", "Starting training...")
+    start = time.perf_counter()
+    with stage("fit"):
+        model.fit(X_train, y_train)
+    log_event("training_complete", "Training complete.", duration_s=time.perf_counter() - start)
 
-# Evaluate
-y_pred = model.predict(X_test)
-acc = accuracy_score(y_test, y_pred)
-f1 = f1_score(y_test, y_pred)
-conf_matrix = confusion_matrix(y_test, y_pred)
+    # Evaluate
+    with stage("evaluate"):
+        y_pred = model.predict(X_test)
+        acc = accuracy_score(y_test, y_pred)
+        f1 = f1_score(y_test, y_pred)
+        conf_matrix = confusion_matrix(y_test, y_pred)
 
-logging.info(f"Accuracy: {acc:.2f}")
-logging.info(f"F1 Score: {f1:.2f}")
-logging.info(f"Confusion Matrix: {conf_matrix.tolist()}")
+    # Compute TP, TN, FP, FN
+    tp = conf_matrix[1, 1]
+    tn = conf_matrix[0, 0]
+    fp = conf_matrix[0, 1]
+    fn = conf_matrix[1, 0]
 
-# Compute TP, TN, FP, FN
-tp = conf_matrix[1, 1]
-tn = conf_matrix[0, 0]
-fp = conf_matrix[0, 1]
-fn = conf_matrix[1, 0]
+    # Metrics as typed fields in a single event, so accuracy and f1_score share a document
+    log_event("metrics", f"Accuracy: {acc:.2f}, F1 Score: {f1:.2f}",
+              accuracy=float(acc), f1_score=float(f1),
+              tp=int(tp), tn=int(tn), fp=int(fp), fn=int(fn),
+              confusion_matrix=conf_matrix.tolist())
+    log_event("model", "Model parameters",
+              coefficients=model.coef_[0].tolist(),
+              feature_names=list(X.columns),
+              intercept=float(model.intercept_[0]))
 
-logging.info(f"TP: {tp}, TN: {tn}, FP: {fp}, FN: {fn}")
-logging.info(f"Model coefficients: {model.coef_.tolist()}")
-logging.info(f"Model intercept: {model.intercept_.tolist()}")
+    log_event("evaluation_complete", "Model evaluation completed.")
 
-logging.info("Model evaluation completed.")
+# Stage profile, also as one event so run timings can be charted in Kibana
+summary = profiler.summary()
+log_event("stage_profile", f"Run took {summary['wall_s']:.2f}s",
+          wall_s=summary["wall_s"], cpu_s=summary["cpu_s"], peak_rss_mb=summary["peak_rss_mb"],
+          stages=[{k: record[k] for k in ("stage", "wall_s", "cpu_s", "peak_rss_mb")}
+                  for record in summary["stages"]])
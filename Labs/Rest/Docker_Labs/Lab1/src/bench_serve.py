@@ -0,0 +1,104 @@
+# src/bench_serve.py
+
+import sys
+import json
+import time
+import random
+import argparse
+import subprocess
+import urllib.request
+from statistics import median
+
+
+def bench_cli(samples):
+    """One fresh interpreter + model load per prediction, like `python src/predict.py k d`."""
+    latencies = []
+    for kills, deaths in samples:
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "src/predict.py", str(kills), str(deaths)],
+                       check=True, capture_output=True)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def bench_stdin(samples):
+    """Startup until the first answer, then per-request round trips over the line protocol."""
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "src/serve.py", "--mode", "stdin"],
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, bufsize=1)
+    latencies = []
+    try:
+        for kills, deaths in samples:
+            request_start = time.perf_counter()
+            proc.stdin.write(f"{kills} {deaths}\n")
+            proc.stdin.flush()
+            proc.stdout.readline()
+            latencies.append(time.perf_counter() - request_start)
+            if len(latencies) == 1:
+                startup = time.perf_counter() - start
+    finally:
+        proc.stdin.close()
+        proc.wait()
+    return startup, latencies[1:]
+
+
+def bench_http(samples, port, batch_size):
+    """Startup until /health answers, then single and batched POST /predict latency."""
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "src/serve.py", "--mode", "http", "--port", str(port),
+                             "--host", "127.0.0.1"],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    try:
+        while True:
+            try:
+                urllib.request.urlopen(f"{url}/health").read()
+                break
+            except OSError:
+                time.sleep(0.01)
+        startup = time.perf_counter() - start
+
+        def post(pairs):
+            request = urllib.request.Request(f"{url}/predict", data=json.dumps({"pairs": pairs}).encode(),
+                                             headers={"Content-Type": "application/json"})
+            return json.loads(urllib.request.urlopen(request).read())["labels"]
+
+        single = []
+        for pair in samples:
+            request_start = time.perf_counter()
+            post([list(pair)])
+            single.append(time.perf_counter() - request_start)
+
+        batch = [list(random.choice(samples)) for _ in range(batch_size)]
+        request_start = time.perf_counter()
+        post(batch)
+        batch_s = time.perf_counter() - request_start
+    finally:
+        proc.terminate()
+        proc.wait()
+    return startup, single, batch_s
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the CLI against the resident scoring service.")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--cli-requests", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    random.seed(42)
+    samples = [(random.randint(1_000, 40_000), random.randint(1_000, 40_000)) for _ in range(args.requests)]
+
+    cli = bench_cli(samples[:args.cli_requests])
+    print(f"CLI          per prediction (incl. startup): median {median(cli) * 1000:8.1f} ms")
+
+    startup, lines = bench_stdin(samples)
+    print(f"stdin server startup to first answer:        {startup * 1000:8.1f} ms")
+    print(f"stdin server per request:             median {median(lines) * 1000:8.2f} ms")
+
+    startup, single, batch_s = bench_http(samples, args.port, args.batch_size)
+    print(f"HTTP server  startup until healthy:          {startup * 1000:8.1f} ms")
+    print(f"HTTP server  per request:             median {median(single) * 1000:8.2f} ms")
+    print(f"HTTP server  batch of {args.batch_size:,}:                {batch_s * 1000:8.1f} ms "
+          f"({args.batch_size / batch_s:,.0f} players/s)")
@@ -1,30 +1,50 @@
 # src/predict.py
 
 import joblib
-import pandas as pd
+import numpy as np
+import warnings
 import sys
 import os
 
-def predict(total_kills, total_deaths):
-    model_path = "data/csgo_model.pkl"
+MODEL_PATH = "data/csgo_model.pkl"
+LABELS = np.array(["Average Player", "High Performer"])
+
+# The model was fit on a DataFrame; a plain array in the same column order is
+# equivalent. The filter is installed once here rather than per call, because
+# catch_warnings() swaps process-wide state and is not safe under serve.py's threads
+# (a DataFrame would need pandas, which the serve image leaves out)
+warnings.filterwarnings("ignore", message="X does not have valid feature names", category=UserWarning)
+
+
+def load_model(model_path=MODEL_PATH):
     if not os.path.exists(model_path):
         raise FileNotFoundError("Model not found. Please run train.py first.")
 
     # Load trained model
-    model = joblib.load(model_path)
+    return joblib.load(model_path)
+
+
+def build_features(total_kills, total_deaths):
+    """Feature matrix [total_kills, total_deaths, KD_ratio] for one or many players."""
+    kills = np.atleast_1d(np.asarray(total_kills, dtype=float))
+    deaths = np.atleast_1d(np.asarray(total_deaths, dtype=float))
 
     # Compute KD ratio from inputs
-    kd_ratio = total_kills / (total_deaths + 1)
+    kd_ratio = kills / (deaths + 1)
+    return np.column_stack([kills, deaths, kd_ratio])
+
+
+def predict_labels(model, total_kills, total_deaths):
+    """Vectorized prediction: returns one label per (kills, deaths) pair."""
+    predictions = model.predict(build_features(total_kills, total_deaths))
+    return LABELS[predictions.astype(int)].tolist()
 
-    # Prepare input features for model
-    features = pd.DataFrame(
-        [[total_kills, total_deaths, kd_ratio]],
-        columns=["total_kills", "total_deaths", "KD_ratio"]
-    )
+
+def predict(total_kills, total_deaths):
+    model = load_model()
 
     # Make prediction
-    prediction = model.predict(features)[0]
-    label = "High Performer" if prediction == 1 else "Average Player"
+    label = predict_labels(model, total_kills, total_deaths)[0]
     print(f"Prediction: {label}")
 
 if __name__ == "__main__":
@@ -0,0 +1,127 @@
+# src/serve.py
+
+import sys
+import json
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from predict import MODEL_PATH, load_model, predict_labels
+
+
+def parse_pairs(line):
+    """Parse 'kills deaths' or 'kills,deaths' pairs separated by ';'."""
+    kills, deaths = [], []
+    for pair in line.split(";"):
+        if not pair.strip():
+            continue
+        k, d = pair.replace(",", " ").split()
+        kills.append(float(k))
+        deaths.append(float(d))
+    return kills, deaths
+
+
+def serve_stdin(model, batch_lines=1):
+    """
+    Line protocol: each input line holds one or more pairs, each output line
+    the matching labels separated by ';'. Up to batch_lines lines are scored
+    together, which helps when a file is piped in.
+    """
+    pending = []
+
+    def flush():
+        kills, deaths, sizes = [], [], []
+        for line in pending:
+            try:
+                k, d = parse_pairs(line)
+            except ValueError:
+                k, d = [], []
+                sizes.append(None)
+            else:
+                sizes.append(len(k))
+            kills += k
+            deaths += d
+        labels = predict_labels(model, kills, deaths) if kills else []
+        for size in sizes:
+            if size is None:
+                sys.stdout.write("ERROR: expected '<kills> <deaths>' pairs\n")
+                continue
+            sys.stdout.write(";".join(labels[:size]) + "\n")
+            labels = labels[size:]
+        sys.stdout.flush()
+        pending.clear()
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        pending.append(line)
+        if len(pending) >= batch_lines:
+            flush()
+    if pending:
+        flush()
+
+
+def make_handler(model):
+    class PredictHandler(BaseHTTPRequestHandler):
+        def _send(self, status, body):
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send(200, {"status": "healthy"})
+            else:
+                self._send(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path != "/predict":
+                self._send(404, {"error": "not found"})
+                return
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                pairs = body["pairs"]
+                kills = [float(k) for k, _ in pairs]
+                deaths = [float(d) for _, d in pairs]
+            except (ValueError, KeyError, TypeError):
+                self._send(400, {"error": 'expected {"pairs": [[kills, deaths], ...]}'})
+                return
+            labels = predict_labels(model, kills, deaths) if pairs else []
+            self._send(200, {"labels": labels})
+
+        def log_message(self, format, *args):
+            # Keep per-request access logs out of the latency path
+            pass
+
+    return PredictHandler
+
+
+def serve_http(model, host="0.0.0.0", port=8000):
+    server = ThreadingHTTPServer((host, port), make_handler(model))
+    print(f"Serving predictions on http://{host}:{port}/predict", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resident CSGO player scoring service.")
+    parser.add_argument("--mode", choices=["stdin", "http"], default="http")
+    parser.add_argument("--host", type=str, default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--batch-lines", type=int, default=1,
+                        help="stdin mode: number of lines scored together")
+    parser.add_argument("--model", type=str, default=MODEL_PATH)
+    args = parser.parse_args()
+
+    # Load the model once for the lifetime of the process
+    model = load_model(args.model)
+    if args.mode == "stdin":
+        serve_stdin(model, args.batch_lines)
+    else:
+        serve_http(model, args.host, args.port)
@@ -0,0 +1 @@
+"""Helpers shared across the labs (import with `Labs/` on sys.path: `from common import ...`)."""
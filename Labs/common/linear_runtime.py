@@ -0,0 +1,351 @@
+"""
+Export sklearn linear models to a small .npz and score them with NumPy only.
+
+The runtime side (LinearScorer) imports nothing but numpy, json and re, so a
+serving process skips the sklearn import, the pickle load and sklearn's
+per-call input validation. Supported: LinearRegression / Ridge-style
+regressors and binary or multinomial LogisticRegression, fed either dense
+rows (with an optional one-hot schema) or text through an exported
+word-unigram TfidfVectorizer.
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import warnings
+import subprocess
+from collections import Counter
+import numpy as np
+
+FORMAT_VERSION = 1
+BATCH_SIZE = 8192
+
+# Snippets timed in a fresh interpreter so imports and loading are measured cold
+COLD_START = {
+    "sklearn": (
+        "import joblib\n"
+        "model = joblib.load({model_path!r})\n"
+        "{load_vectorizer}"
+    ),
+    "npz": (
+        "import sys\n"
+        "sys.path.insert(0, {labs_dir!r})\n"
+        "from common.linear_runtime import LinearScorer\n"
+        "scorer = LinearScorer.load({npz_path!r})\n"
+    ),
+}
+
+
+# ----------------------------------------------------------------------
+# Export (needs the fitted sklearn objects, not sklearn at runtime)
+# ----------------------------------------------------------------------
+def _text_schema(vectorizer):
+    """Validate that the vectorizer can be replayed without sklearn and describe it."""
+    params = vectorizer.get_params()
+    unsupported = {
+        "analyzer": ("word",),
+        "ngram_range": ((1, 1),),
+        "tokenizer": (None,),
+        "preprocessor": (None,),
+        "strip_accents": (None,),
+        "input": ("content",),
+    }
+    for name, allowed in unsupported.items():
+        if params.get(name) not in allowed:
+            raise ValueError(f"❌ {type(vectorizer).__name__}({name}={params.get(name)!r}) is not supported")
+    return {
+        "lowercase": params["lowercase"],
+        "token_pattern": params["token_pattern"],
+        "binary": params.get("binary", False),
+        "sublinear_tf": params.get("sublinear_tf", False),
+        "use_idf": params.get("use_idf", False),
+        "norm": params.get("norm"),
+    }
+
+
+def export_linear(model, path, feature_names=None, one_hot=None, vectorizer=None):
+    """
+    Save a fitted linear model (and its preprocessing) to `path` (.npz).
+
+    Args:
+        model: Fitted estimator with coef_ / intercept_ (and classes_ for classifiers).
+        feature_names (list): Column order of the design matrix, for dense records.
+        one_hot (dict): {raw column: [category, ...]} for one-hot columns named
+            "<column>_<category>" in feature_names (pd.get_dummies naming).
+        vectorizer: Optional fitted TfidfVectorizer/CountVectorizer for text input.
+    Returns:
+        dict: The schema written alongside the arrays.
+    """
+    coef = np.atleast_2d(np.asarray(model.coef_, dtype=np.float64))
+    arrays = {
+        "coef": coef.astype(np.float32),
+        "intercept": np.atleast_1d(np.asarray(model.intercept_, dtype=np.float64)).astype(np.float32),
+    }
+    classes = getattr(model, "classes_", None)
+    if classes is not None:
+        arrays["classes"] = np.asarray(classes)
+
+    if feature_names is None and hasattr(model, "feature_names_in_"):
+        feature_names = [str(name) for name in model.feature_names_in_]
+    schema = {
+        "format": FORMAT_VERSION,
+        "estimator": type(model).__name__,
+        "kind": "classifier" if classes is not None else "regressor",
+        "single_output": np.ndim(model.coef_) == 1,
+        "feature_names": list(feature_names) if feature_names is not None else None,
+        "one_hot": one_hot or {},
+        "text": None,
+    }
+    if vectorizer is not None:
+        schema["text"] = _text_schema(vectorizer)
+        terms = np.empty(len(vectorizer.vocabulary_), dtype=object)
+        for term, index in vectorizer.vocabulary_.items():
+            terms[index] = term
+        arrays["vocabulary"] = terms.astype(str)
+        if schema["text"]["use_idf"]:
+            arrays["idf"] = np.asarray(vectorizer.idf_, dtype=np.float64)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "wb") as f:
+        np.savez(f, schema=np.array(json.dumps(schema)), **arrays)
+    return schema
+
+
+# ----------------------------------------------------------------------
+# Runtime
+# ----------------------------------------------------------------------
+class CSR:
+    """Minimal CSR matrix (data, indices, indptr), e.g. from LinearScorer.transform_text."""
+
+    def __init__(self, data, indices, indptr, shape):
+        self.data, self.indices, self.indptr, self.shape = data, indices, indptr, shape
+
+
+class LinearScorer:
+    """Batched float32 scoring of an exported linear model."""
+
+    def __init__(self, coef, intercept, schema, classes=None, vocabulary=None, idf=None):
+        self.coef = np.ascontiguousarray(coef, dtype=np.float32)
+        self.coef_t = np.ascontiguousarray(self.coef.T)
+        self.intercept = np.asarray(intercept, dtype=np.float32)
+        self.schema = schema
+        self.classes = classes
+        self.idf = idf
+        self.vocabulary = None
+        if vocabulary is not None:
+            self.vocabulary = {term: i for i, term in enumerate(vocabulary.tolist())}
+            self._token_re = re.compile(schema["text"]["token_pattern"])
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as npz:
+            schema = json.loads(str(npz["schema"]))
+            if schema["format"] != FORMAT_VERSION:
+                raise ValueError(f"❌ Unsupported linear model format {schema['format']}")
+            get = lambda name: npz[name] if name in npz.files else None
+            return cls(npz["coef"], npz["intercept"], schema, get("classes"), get("vocabulary"), get("idf"))
+
+    # ---- Preprocessing ----
+
+    def transform_records(self, records):
+        """
+        Dense float32 design matrix from dict rows or a DataFrame, following
+        the exported feature order; one-hot columns are rebuilt from the raw
+        categorical column.
+        """
+        names = self.schema["feature_names"]
+        if names is None:
+            raise ValueError("❌ Model was exported without feature_names")
+        is_frame = hasattr(records, "columns")
+        n = len(records)
+        X = np.empty((n, len(names)), dtype=np.float32)
+        one_hot = {f"{col}_{cat}": (col, cat) for col, cats in self.schema["one_hot"].items() for cat in cats}
+        for j, name in enumerate(names):
+            if is_frame:
+                if name in one_hot:
+                    col, cat = one_hot[name]
+                    X[:, j] = (np.asarray(records[col]) == cat)
+                else:
+                    X[:, j] = np.asarray(records[name], dtype=np.float32)
+            elif name in one_hot:
+                col, cat = one_hot[name]
+                X[:, j] = [row[col] == cat for row in records]
+            else:
+                X[:, j] = [row[name] for row in records]
+        return X
+
+    def transform_text(self, texts):
+        """Replay the exported word-unigram TF-IDF as a float32 CSR matrix."""
+        if self.vocabulary is None:
+            raise ValueError("❌ Model was exported without a vectorizer")
+        text = self.schema["text"]
+        vocabulary, findall = self.vocabulary, self._token_re.findall
+        data, indices, indptr = [], [], [0]
+        for doc in texts:
+            if text["lowercase"]:
+                doc = doc.lower()
+            counts = Counter(vocabulary[t] for t in findall(doc) if t in vocabulary)
+            row_idx = np.fromiter(counts.keys(), dtype=np.int32, count=len(counts))
+            row = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+            if text["binary"]:
+                row[:] = 1.0
+            elif text["sublinear_tf"]:
+                row = np.log(row) + 1.0
+            if self.idf is not None:
+                row *= self.idf[row_idx]
+            if text["norm"] == "l2" and len(row):
+                row /= np.sqrt(np.dot(row, row))
+            elif text["norm"] == "l1" and len(row):
+                row /= np.abs(row).sum()
+            data.append(row)
+            indices.append(row_idx)
+            indptr.append(indptr[-1] + len(row))
+        return CSR(
+            np.concatenate(data).astype(np.float32) if data else np.empty(0, np.float32),
+            np.concatenate(indices) if indices else np.empty(0, np.int32),
+            np.asarray(indptr, dtype=np.int64),
+            (len(texts), len(vocabulary)),
+        )
+
+    # ---- Scoring ----
+
+    def decision_function(self, X, batch_size=BATCH_SIZE):
+        """X @ coef.T + intercept for dense arrays or CSR input (anything with data/indices/indptr)."""
+        if hasattr(X, "indptr"):
+            scores = self._sparse_scores(X)
+        else:
+            X = np.asarray(X, dtype=np.float32)
+            scores = np.empty((X.shape[0], self.coef.shape[0]), dtype=np.float32)
+            for start in range(0, X.shape[0], batch_size):
+                np.matmul(X[start:start + batch_size], self.coef_t, out=scores[start:start + batch_size])
+            scores += self.intercept
+        if self.schema["single_output"] or (scores.shape[1] == 1 and self.schema["kind"] == "classifier"):
+            return scores[:, 0]
+        return scores
+
+    def _sparse_scores(self, X):
+        n_rows = len(X.indptr) - 1
+        rows = np.repeat(np.arange(n_rows), np.diff(X.indptr))
+        data = np.asarray(X.data, dtype=np.float32)
+        scores = np.empty((n_rows, self.coef.shape[0]), dtype=np.float32)
+        for k in range(self.coef.shape[0]):
+            contributions = data * self.coef[k][X.indices]
+            scores[:, k] = np.bincount(rows, weights=contributions, minlength=n_rows)
+        return scores + self.intercept
+
+    def predict(self, X):
+        scores = self.decision_function(X)
+        if self.schema["kind"] == "regressor":
+            return scores
+        if scores.ndim == 1:
+            return self.classes[(scores > 0).astype(np.intp)]
+        return self.classes[scores.argmax(axis=1)]
+
+    def predict_proba(self, X):
+        if self.schema["kind"] != "classifier":
+            raise ValueError("❌ predict_proba is only available for classifiers")
+        scores = self.decision_function(X).astype(np.float64)
+        if scores.ndim == 1:
+            positive = 1.0 / (1.0 + np.exp(-scores))
+            return np.column_stack([1.0 - positive, positive])
+        scores -= scores.max(axis=1, keepdims=True)
+        np.exp(scores, out=scores)
+        return scores / scores.sum(axis=1, keepdims=True)
+
+
+# ----------------------------------------------------------------------
+# Benchmark
+# ----------------------------------------------------------------------
+def _cold_start(kind, model_path, npz_path, vectorizer_path=None):
+    """Load time and peak RSS of a fresh interpreter that only loads the model."""
+    load_vectorizer = f"vectorizer = joblib.load({vectorizer_path!r})\n" if vectorizer_path else ""
+    code = (
+        "import time, resource\n"
+        "start = time.perf_counter()\n"
+        + COLD_START[kind].format(model_path=model_path, npz_path=npz_path, load_vectorizer=load_vectorizer,
+                                  labs_dir=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        + "elapsed = time.perf_counter() - start\n"
+        "try:\n"
+        "    # VmHWM is reset by exec, unlike ru_maxrss on Linux\n"
+        "    status = open('/proc/self/status').read()\n"
+        "    rss_mb = int(status.split('VmHWM:')[1].split()[0]) / 1024\n"
+        "except OSError:\n"
+        "    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024)\n"
+        "print(elapsed, rss_mb)\n"
+    )
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    elapsed, rss_mb = output.stdout.split()
+    return float(elapsed), float(rss_mb)
+
+
+def benchmark(model_path, npz_path, vectorizer_path=None, rows=100_000, seed=0):
+    """
+    Compare cold start, peak RSS and rows/sec of the joblib model against the
+    .npz scorer on synthetic input, and check prediction parity.
+    """
+    import joblib
+
+    model = joblib.load(model_path)
+    vectorizer = joblib.load(vectorizer_path) if vectorizer_path else None
+    scorer = LinearScorer.load(npz_path)
+    rng = np.random.default_rng(seed)
+
+    if vectorizer is not None:
+        terms = np.array(list(scorer.vocabulary))
+        X_raw = [" ".join(rng.choice(terms, size=rng.integers(20, 200))) for _ in range(rows)]
+        pipelines = {
+            "sklearn": lambda: model.predict_proba(vectorizer.transform(X_raw)),
+            "npz": lambda: scorer.predict_proba(scorer.transform_text(X_raw)),
+        }
+    else:
+        X_raw = rng.normal(size=(rows, scorer.coef.shape[1]))
+        if scorer.schema["kind"] == "classifier":
+            pipelines = {"sklearn": lambda: model.predict_proba(X_raw), "npz": lambda: scorer.predict_proba(X_raw)}
+        else:
+            pipelines = {"sklearn": lambda: model.predict(X_raw), "npz": lambda: scorer.predict(X_raw)}
+
+    results = {}
+    for kind, run in pipelines.items():
+        load_s, rss_mb = _cold_start(kind, model_path, npz_path, vectorizer_path)
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore", message="X does not have valid feature names")
+            start = time.perf_counter()
+            results[kind] = run()
+            elapsed = time.perf_counter() - start
+        print(f"{kind:<8} cold start {load_s:6.3f}s | peak RSS {rss_mb:7.1f} MiB | "
+              f"{rows / elapsed:12,.0f} rows/s")
+
+    diff = np.abs(np.asarray(results["sklearn"], dtype=np.float64) - results["npz"]).max()
+    scale = max(1.0, float(np.abs(results["sklearn"]).max()))
+    if diff > 1e-4 * scale:
+        raise AssertionError(f"❌ Scorer output differs from sklearn (max abs diff {diff:.3g})")
+    print(f"✅ Parity on {rows:,} rows (max abs diff {diff:.2g})")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export/benchmark linear models for the NumPy runtime.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    exp = sub.add_parser("export", help="Export a joblib model (and vectorizer) to .npz")
+    exp.add_argument("--model", type=str, required=True)
+    exp.add_argument("--vectorizer", type=str, default=None)
+    exp.add_argument("--out", type=str, required=True)
+
+    bench = sub.add_parser("bench", help="Benchmark a joblib model against its .npz export")
+    bench.add_argument("--model", type=str, required=True)
+    bench.add_argument("--vectorizer", type=str, default=None)
+    bench.add_argument("--npz", type=str, required=True)
+    bench.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    if args.command == "export":
+        import joblib
+
+        vectorizer = joblib.load(args.vectorizer) if args.vectorizer else None
+        export_linear(joblib.load(args.model), args.out, vectorizer=vectorizer)
+        print(f"💾 Exported to {args.out} ({os.path.getsize(args.out) / 1024:.1f} KiB)")
+    else:
+        benchmark(args.model, args.npz, args.vectorizer, args.rows)
@@ -0,0 +1,356 @@
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import threading
+import contextlib
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Set to 1 (or a sampling interval in ms) to turn on the sampler in every entry point
+SAMPLE_ENV = "LABS_PROFILE_SAMPLE"
+DEFAULT_INTERVAL = 0.005
+MIB = 1024 * 1024
+
+_ACTIVE = []  # profilers of the enclosing runs, innermost last
+
+
+def _status_mb(field):
+    """VmRSS / VmHWM of this process in MiB from /proc, or None off Linux."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def _peak_rss_mb():
+    peak = _status_mb("VmHWM:")
+    if peak is None and resource is not None:
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak = rss / MIB if sys.platform == "darwin" else rss / 1024
+    return peak
+
+
+def _reset_peak_rss():
+    """Restart the VmHWM high-water mark so each stage gets its own peak (Linux only)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+class _Sampler(threading.Thread):
+    """
+    Statistical profiler: every `interval` seconds, record the profiled
+    thread's Python stack under the current stage path. Costs one
+    sys._current_frames() call per sample instead of a hook on every call.
+    """
+
+    def __init__(self, profiler, thread_id, interval):
+        super().__init__(daemon=True, name="stage-sampler")
+        self.profiler = profiler
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        # Frames of the profiler itself and of @contextmanager plumbing are noise
+        skip = {os.path.abspath(__file__), os.path.abspath(contextlib.__file__)}
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                if os.path.abspath(code.co_filename) not in skip:
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            path = self.profiler.current_path() or "(run)"
+            self.stacks[";".join([path] + stack[::-1])] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class StageProfiler:
+    """
+    Wall time, CPU time and peak RSS of the named stages of one training run.
+
+    Stages nest; each closed stage becomes one record and one Chrome trace
+    event. CPU time is process-wide, so it includes threads (n_jobs forests,
+    BLAS) but not worker processes. Peak RSS is per stage on Linux, where
+    the kernel high-water mark can be reset; elsewhere it is the process
+    peak so far.
+
+    `save()` writes `<prefix>profile.json` (run summary and stage records)
+    and `<prefix>trace.json` (open in chrome://tracing or ui.perfetto.dev).
+    With sampling on, `<prefix>profile.folded` holds collapsed stacks for
+    flamegraph.pl or speedscope.
+    """
+
+    def __init__(self, name, out_dir=".", prefix="", sample=None, interval=DEFAULT_INTERVAL):
+        self.name = name
+        self.out_dir = out_dir
+        self.prefix = prefix
+        if sample is None:
+            env = os.environ.get(SAMPLE_ENV, "")
+            sample = env not in ("", "0")
+            if env not in ("", "0", "1"):
+                interval = float(env) / 1000
+        self.sample = sample
+        self.interval = interval
+        self.stages = []
+        self.trace = []
+        self._stack = []  # open stages: [name, wall_start, cpu_start, peak_so_far]
+        self._sampler = None
+        self._per_stage_peak = False
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+        if self.out_dir is not None:
+            self.save()
+            self.print_summary()
+
+    def _ts(self, t):
+        return round((t - self._t0) * 1e6)
+
+    def current_path(self):
+        return "/".join(entry[0] for entry in self._stack)
+
+    def start(self):
+        self._t0 = time.perf_counter()
+        self._cpu0 = time.process_time()
+        self.started_at = datetime.now(timezone.utc).isoformat()
+        self._per_stage_peak = _reset_peak_rss()
+        self._run_peak = _peak_rss_mb()
+        self.trace.append({"name": "process_name", "ph": "M", "pid": os.getpid(), "args": {"name": self.name}})
+        if self.sample:
+            self._sampler = _Sampler(self, threading.get_ident(), self.interval)
+            self._sampler.start()
+        _ACTIVE.append(self)
+
+    def stop(self):
+        if self in _ACTIVE:
+            _ACTIVE.remove(self)
+        if self._sampler is not None:
+            self._sampler.stop()
+        self.wall_s = time.perf_counter() - self._t0
+        self.cpu_s = time.process_time() - self._cpu0
+        self._run_peak = max(filter(None, [self._run_peak, _peak_rss_mb()]), default=None)
+
+    @contextmanager
+    def stage(self, name, **args):
+        """Profile the enclosed block as stage `name`; extra keyword args go into the record."""
+        # Fold the mark reached so far into the enclosing stage before restarting it
+        peak = _peak_rss_mb()
+        if self._stack and peak is not None:
+            self._stack[-1][3] = max(self._stack[-1][3] or 0, peak)
+        self._run_peak = max(filter(None, [self._run_peak, peak]), default=None)
+        if self._per_stage_peak:
+            _reset_peak_rss()
+
+        entry = [name, time.perf_counter(), time.process_time(), None]
+        self._stack.append(entry)
+        path = self.current_path()
+        try:
+            yield args
+        finally:
+            wall_end, cpu_end = time.perf_counter(), time.process_time()
+            self._stack.pop()
+            peak = max(filter(None, [entry[3], _peak_rss_mb()]), default=None)
+            if self._stack and peak is not None:
+                self._stack[-1][3] = max(self._stack[-1][3] or 0, peak)
+            self._run_peak = max(filter(None, [self._run_peak, peak]), default=None)
+            rss = _status_mb("VmRSS:")
+
+            record = {
+                "stage": path,
+                "depth": len(self._stack),
+                "start_s": round(entry[1] - self._t0, 6),
+                "wall_s": round(wall_end - entry[1], 6),
+                "cpu_s": round(cpu_end - entry[2], 6),
+                "peak_rss_mb": round(peak, 1) if peak is not None else None,
+                "rss_mb": round(rss, 1) if rss is not None else None,
+                **args,
+            }
+            self.stages.append(record)
+            self.trace.append({
+                "name": name, "cat": "stage", "ph": "X", "pid": os.getpid(), "tid": threading.get_ident(),
+                "ts": self._ts(entry[1]), "dur": self._ts(wall_end) - self._ts(entry[1]),
+                "args": {k: v for k, v in record.items() if k not in ("stage", "depth", "start_s", "wall_s")},
+            })
+            if rss is not None:
+                self.trace.append({"name": "rss_mb", "ph": "C", "pid": os.getpid(), "ts": self._ts(wall_end),
+                                   "args": {"rss_mb": round(rss, 1)}})
+
+    def summary(self):
+        summary = {
+            "name": self.name,
+            "started_at": self.started_at,
+            "host": socket.gethostname(),
+            "python": sys.version.split()[0],
+            "wall_s": round(self.wall_s, 6),
+            "cpu_s": round(self.cpu_s, 6),
+            "peak_rss_mb": round(self._run_peak, 1) if self._run_peak is not None else None,
+            "per_stage_peak_rss": self._per_stage_peak,
+            "stages": sorted(self.stages, key=lambda s: s["start_s"]),
+        }
+        if self._sampler is not None:
+            summary["sampling_interval_s"] = self.interval
+            summary["top_functions"] = self.top_functions()
+        return summary
+
+    def top_functions(self, n=15):
+        """Innermost frames with the most samples (self time), as fractions of all samples."""
+        total = sum(self._sampler.stacks.values()) or 1
+        leaves = Counter()
+        for stack, count in self._sampler.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return [{"function": f, "samples": c, "fraction": round(c / total, 4)} for f, c in leaves.most_common(n)]
+
+    def save(self, out_dir=None):
+        """Write the profile files; returns their paths."""
+        out_dir = out_dir or self.out_dir
+        os.makedirs(out_dir, exist_ok=True)
+        base = os.path.join(out_dir, self.prefix)
+        paths = [f"{base}profile.json", f"{base}trace.json"]
+        with open(paths[0], "w") as f:
+            json.dump(self.summary(), f, indent=2)
+        with open(paths[1], "w") as f:
+            json.dump({"traceEvents": self.trace, "displayTimeUnit": "ms"}, f)
+        if self._sampler is not None:
+            paths.append(f"{base}profile.folded")
+            with open(paths[2], "w") as f:
+                for stack, count in sorted(self._sampler.stacks.items()):
+                    f.write(f"{stack} {count}\n")
+        return paths
+
+    def print_summary(self):
+        print_stages(self.summary())
+        print(f"💾 Profile saved to {os.path.join(self.out_dir, self.prefix)}profile.json")
+
+
+def profile_run(name, out_dir=".", prefix="", sample=None):
+    """
+    Profile one training run; use as `with profile_run(...) as profiler:`.
+
+    Inside another profiled run (e.g. train() called from the IMDB
+    pipeline), this becomes a stage of the outer run instead, so the whole
+    process ends up in a single trace; `profiler` is then the outer run's
+    StageProfiler, which saves when the outer run ends.
+    """
+    if _ACTIVE:
+        return _nested_run(_ACTIVE[-1], name)
+    return StageProfiler(name, out_dir, prefix, sample)
+
+
+@contextmanager
+def _nested_run(profiler, name):
+    with profiler.stage(name):
+        yield profiler
+
+
+@contextmanager
+def stage(name, **args):
+    """
+    Stage of the active run, as a context manager or decorator. Without an
+    active run it does nothing, so library functions can be decorated freely.
+    """
+    if not _ACTIVE:
+        yield args
+        return
+    with _ACTIVE[-1].stage(name, **args) as record:
+        yield record
+
+
+def print_stages(summary):
+    print(f"\n⏱️ Stage profile: {summary['name']}")
+    print(f"{'stage':<28}{'wall s':>10}{'cpu s':>10}{'peak RSS MiB':>14}")
+    for record in summary["stages"]:
+        label = "  " * record["depth"] + record["stage"].rsplit("/", 1)[-1]
+        peak = record["peak_rss_mb"]
+        print(f"{label:<28}{record['wall_s']:>10.3f}{record['cpu_s']:>10.3f}"
+              f"{peak if peak is not None else float('nan'):>14.1f}")
+    print(f"{'total':<28}{summary['wall_s']:>10.3f}{summary['cpu_s']:>10.3f}"
+          f"{summary['peak_rss_mb'] or float('nan'):>14.1f}")
+
+
+def _stage_totals(summary):
+    totals = {}
+    for record in summary["stages"]:
+        totals.setdefault(record["stage"], {"wall_s": 0.0, "peak_rss_mb": 0.0})
+        totals[record["stage"]]["wall_s"] += record["wall_s"]
+        totals[record["stage"]]["peak_rss_mb"] = max(totals[record["stage"]]["peak_rss_mb"],
+                                                     record["peak_rss_mb"] or 0.0)
+    return totals
+
+
+def compare(baseline, current, threshold=0.2, min_wall_s=0.05):
+    """
+    Stage-by-stage comparison of two profile.json files (e.g. last night's
+    and tonight's). Returns the stages whose wall time or peak RSS grew by
+    more than `threshold`; stages faster than `min_wall_s` are ignored for
+    time, since their timings are mostly noise.
+    """
+    with open(baseline) as f:
+        old = _stage_totals(json.load(f))
+    with open(current) as f:
+        new = _stage_totals(json.load(f))
+
+    regressions = []
+    print(f"{'stage':<28}{'wall s':>18}{'change':>9}{'peak RSS MiB':>20}{'change':>9}")
+    for path in [p for p in new if p in old]:
+        a, b = old[path], new[path]
+        wall = b["wall_s"] / a["wall_s"] - 1 if a["wall_s"] else 0.0
+        rss = b["peak_rss_mb"] / a["peak_rss_mb"] - 1 if a["peak_rss_mb"] else 0.0
+        slow = wall > threshold and max(a["wall_s"], b["wall_s"]) >= min_wall_s
+        if slow or rss > threshold:
+            regressions.append({"stage": path, "wall_change": wall, "peak_rss_change": rss})
+        flag = " ❌" if slow or rss > threshold else ""
+        print(f"{path:<28}{a['wall_s']:>8.3f} → {b['wall_s']:<7.3f}{wall:>+9.0%}"
+              f"{a['peak_rss_mb']:>9.1f} → {b['peak_rss_mb']:<8.1f}{rss:>+9.0%}{flag}")
+    for path in [p for p in new if p not in old]:
+        print(f"{path:<28}{'new stage':>18}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect and compare stage profiles of training runs.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    show = sub.add_parser("show", help="Print the stage table of a profile.json")
+    show.add_argument("profile", type=str)
+    cmp = sub.add_parser("compare", help="Flag stages that got slower or bigger; exits 1 on regressions")
+    cmp.add_argument("baseline", type=str)
+    cmp.add_argument("current", type=str)
+    cmp.add_argument("--threshold", type=float, default=0.2, help="Allowed relative growth (0.2 = 20%%)")
+    cmp.add_argument("--min-wall-s", type=float, default=0.05)
+    args = parser.parse_args()
+
+    if args.command == "show":
+        with open(args.profile) as f:
+            print_stages(json.load(f))
+    else:
+        found = compare(args.baseline, args.current, args.threshold, args.min_wall_s)
+        if found:
+            print(f"❌ {len(found)} stage(s) regressed by more than {args.threshold:.0%}")
+            sys.exit(1)
+        print("✅ No stage regressed")
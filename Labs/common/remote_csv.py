@@ -0,0 +1,178 @@
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import tempfile
+import warnings
+import urllib.error
+import urllib.request
+import pandas as pd
+
+CACHE_DIR = os.environ.get("LABS_DATA_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "mlops_labs"))
+CHUNK_SIZE = 1 << 20
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_path(url, cache_dir=CACHE_DIR):
+    """Local file for `url`: a short hash of the URL keeps same-named files apart."""
+    name = os.path.basename(url.split("?")[0]) or "data.csv"
+    return os.path.join(cache_dir, f"{hashlib.sha1(url.encode()).hexdigest()[:12]}_{name}")
+
+
+def _read_meta(path):
+    try:
+        with open(path + ".json") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _download(url, path, meta, sha256, timeout):
+    """Conditional GET into a temp file, hashed while streaming; returns the new meta (None on 304)."""
+    headers = {}
+    if meta and os.path.exists(path):
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    request = urllib.request.Request(url, headers=headers)
+    try:
+        response = urllib.request.urlopen(request, timeout=timeout)
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return None
+        raise
+
+    digest = hashlib.sha256()
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+    try:
+        with response, os.fdopen(fd, "wb") as f:
+            for chunk in iter(lambda: response.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+                f.write(chunk)
+        if sha256 and digest.hexdigest() != sha256:
+            raise ValueError(f"Checksum mismatch for {url}: expected {sha256}, got {digest.hexdigest()}")
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+    return {
+        "url": url,
+        "sha256": digest.hexdigest(),
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "fetched_at": time.time(),
+    }
+
+
+def cached_download(url, cache_dir=CACHE_DIR, sha256=None, max_age=None, refresh=False, timeout=30):
+    """
+    Download `url` once and return the local path.
+
+    A cached copy is reused without touching the network unless it is older
+    than `max_age` seconds (then it is revalidated with a conditional GET) or
+    `refresh` is set. The checksum recorded at download time, or the pinned
+    `sha256`, is verified on every hit; a corrupt copy is downloaded again.
+    If the network is unavailable, a valid cached copy is used with a warning.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    path = cache_path(url, cache_dir)
+    meta = _read_meta(path)
+
+    cached = False
+    if meta and os.path.exists(path):
+        expected = sha256 or meta["sha256"]
+        if _sha256(path) == expected:
+            cached = True
+        else:
+            warnings.warn(f"Cached copy of {url} failed its checksum; downloading again")
+            meta = None
+
+    stale = max_age is not None and cached and time.time() - meta["fetched_at"] > max_age
+    if cached and not (refresh or stale):
+        return path
+
+    try:
+        new_meta = _download(url, path, meta if cached else None, sha256, timeout)
+    except (urllib.error.URLError, OSError) as e:
+        if cached:
+            warnings.warn(f"Could not reach {url} ({e}); using the cached copy from "
+                          f"{time.ctime(meta['fetched_at'])}")
+            return path
+        raise
+
+    # 304 Not Modified: only the freshness timestamp changes
+    new_meta = new_meta or {**meta, "fetched_at": time.time()}
+    with open(path + ".json", "w") as f:
+        json.dump(new_meta, f, indent=2)
+    return path
+
+
+def read_remote_csv(url, usecols=None, dtype=None, cache_dir=CACHE_DIR, sha256=None, max_age=None,
+                    refresh=False, **read_csv_kwargs):
+    """
+    pd.read_csv for a remote CSV through the local cache.
+
+    Pass `usecols` and compact `dtype`s (int8/float32/category) so only the
+    needed columns are parsed, straight into their final types.
+    """
+    path = cached_download(url, cache_dir, sha256=sha256, max_age=max_age, refresh=refresh)
+    return pd.read_csv(path, usecols=usecols, dtype=dtype, **read_csv_kwargs)
+
+
+def benchmark(url, usecols=None, dtype=None, repeats=5):
+    """Time plain pd.read_csv(url) against a cold and a warm cached, typed read."""
+    timings = {}
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        plain = pd.read_csv(url)
+    timings["pd.read_csv(url)"] = (time.perf_counter() - start) / repeats
+
+    cache_dir = tempfile.mkdtemp()
+    try:
+        start = time.perf_counter()
+        read_remote_csv(url, usecols, dtype, cache_dir=cache_dir)
+        timings["cached, cold"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            typed = read_remote_csv(url, usecols, dtype, cache_dir=cache_dir)
+        timings["cached, warm"] = (time.perf_counter() - start) / repeats
+    finally:
+        shutil.rmtree(cache_dir)
+
+    for label, seconds in timings.items():
+        print(f"{label:<18} {seconds * 1000:9.1f} ms")
+    print(f"memory: {plain.memory_usage(deep=True).sum() / 1024:,.0f} KiB all columns -> "
+          f"{typed.memory_usage(deep=True).sum() / 1024:,.0f} KiB typed usecols")
+    return timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fetch a remote CSV into the local cache.")
+    parser.add_argument("url", type=str)
+    parser.add_argument("--sha256", type=str, default=None, help="Expected checksum")
+    parser.add_argument("--refresh", action="store_true", help="Revalidate even if cached")
+    parser.add_argument("--usecols", type=str, nargs="+", default=None)
+    parser.add_argument("--dtype", type=json.loads, default=None, help='e.g. \'{"Age": "float32"}\'')
+    parser.add_argument("--bench", action="store_true", help="Compare load times with pd.read_csv(url)")
+    args = parser.parse_args()
+
+    if args.bench:
+        benchmark(args.url, args.usecols, args.dtype)
+        sys.exit(0)
+    path = cached_download(args.url, sha256=args.sha256, refresh=args.refresh)
+    print(f"{path} ({_read_meta(path)['sha256']})")